@@ -6,11 +6,12 @@ Nodes are pure functions that take state and return state updates.
 
 from typing import Dict, Any
 from datetime import datetime
+import json
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from services import product_service, trends_service, get_ai_optimizer
+from services import trends_service, get_product_service, get_ai_optimizer
 from .state import GraphState
 
 
@@ -26,18 +27,14 @@ def fetch_products_node(state: GraphState) -> Dict[str, Any]:
         
         if product_ids:
             # Fetch specific products
-            products = []
-            for pid in product_ids:
-                product = product_service.get_product_by_id(pid)
-                if product:
-                    products.append(product)
+            products = get_product_service().get_products_by_ids(product_ids)
         else:
             # Fetch all products
-            products = product_service.fetch_products()
+            products = get_product_service().fetch_products()
         
         # Generate summaries
         summaries = [
-            product_service.get_product_summary(p) for p in products
+            get_product_service().get_product_summary(p) for p in products
         ]
         
         return {
@@ -181,6 +178,7 @@ def apply_updates_node(state: GraphState) -> Dict[str, Any]:
         
         updated = []
         failed = []
+        batch = []
         
         for product_id in products_to_update:
             recs = rec_lookup.get(product_id, {})
@@ -192,45 +190,45 @@ def apply_updates_node(state: GraphState) -> Dict[str, Any]:
                 })
                 continue
             
-            try:
-                # Build update payload
-                import json
-                updates = {
-                    'title': recs.get('optimizedTitle'),
-                    'descriptionHtml': recs.get('optimizedDescription'),
-                    'seo': {
-                        'title': recs.get('seoTitle'),
-                        'description': recs.get('seoDescription')
+            # Build update payload
+            updates = {
+                'title': recs.get('optimizedTitle'),
+                'descriptionHtml': recs.get('optimizedDescription'),
+                'seo': {
+                    'title': recs.get('seoTitle'),
+                    'description': recs.get('seoDescription')
+                },
+                'metafields': [
+                    {
+                        'namespace': 'ai_optimizer',
+                        'key': 'layout_style',
+                        'value': recs.get('layoutStyle', 'hero'),
+                        'type': 'single_line_text_field'
                     },
-                    'metafields': [
-                        {
-                            'namespace': 'ai_optimizer',
-                            'key': 'layout_style',
-                            'value': recs.get('layoutStyle', 'hero'),
-                            'type': 'single_line_text_field'
-                        },
-                        {
-                            'namespace': 'ai_optimizer',
-                            'key': 'trend_alignment',
-                            'value': recs.get('trendAlignment', ''),
-                            'type': 'single_line_text_field'
-                        },
-                        {
-                            'namespace': 'ai_optimizer',
-                            'key': 'trust_badges',
-                            'value': json.dumps(recs.get('trustBadges', [])),
-                            'type': 'json'
-                        }
-                    ]
-                }
-                
-                result = product_service.update_product(product_id, updates)
-                updated.append(result)
-                
-            except Exception as e:
+                    {
+                        'namespace': 'ai_optimizer',
+                        'key': 'trend_alignment',
+                        'value': recs.get('trendAlignment', ''),
+                        'type': 'single_line_text_field'
+                    },
+                    {
+                        'namespace': 'ai_optimizer',
+                        'key': 'trust_badges',
+                        'value': json.dumps(recs.get('trustBadges', [])),
+                        'type': 'json'
+                    }
+                ]
+            }
+            batch.append((product_id, updates))
+        
+        # Apply all updates concurrently
+        for result in get_product_service().update_products(batch):
+            if result['success']:
+                updated.append(result['product'])
+            else:
                 failed.append({
-                    'productId': product_id,
-                    'error': str(e)
+                    'productId': result['product_id'],
+                    'error': result['error']
                 })
         
         return {
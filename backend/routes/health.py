@@ -9,7 +9,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import config
-from services import shopify_auth, video_analyzer
+from services import shopify_auth, get_video_analyzer
 
 health_bp = Blueprint('health', __name__)
 
@@ -91,7 +91,7 @@ def services_status():
         },
         'twelve_labs': {
             'configured': validation['twelve_labs_configured'],
-            'available': video_analyzer.is_available()
+            'available': get_video_analyzer().is_available()
         },
         'youtube': {
             'configured': validation['youtube_configured']
@@ -10,7 +10,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from services import (
-    product_service,
+    get_product_service,
     trends_service,
     get_ai_optimizer,
     get_trend_matcher,
@@ -33,7 +33,7 @@ def get_products():
     """
     try:
         limit = request.args.get('limit', 50, type=int)
-        products = product_service.fetch_products(limit=limit)
+        products = get_product_service().fetch_products(limit=limit)
         
         return jsonify({
             'success': True,
@@ -63,7 +63,7 @@ def get_product(product_id):
         if not product_id.startswith('gid://'):
             product_id = f"gid://shopify/Product/{product_id}"
         
-        product = product_service.get_product_by_id(product_id)
+        product = get_product_service().get_product_by_id(product_id)
         
         if not product:
             return jsonify({
@@ -97,20 +97,19 @@ def analyze_all_products():
         JSON with analysis results and recommendations
     """
     try:
-        # Fetch products
-        products = product_service.fetch_products()
+        # Stream products straight into summaries; only the summaries are kept
+        product_service = get_product_service()
+        product_summaries = [
+            product_service.get_product_summary(p)
+            for p in product_service.iter_products(fields='summary')
+        ]
         
-        if not products:
+        if not product_summaries:
             return jsonify({
                 'success': False,
                 'error': 'No products found'
             }), 404
         
-        # Get product summaries for AI
-        product_summaries = [
-            product_service.get_product_summary(p) for p in products
-        ]
-        
         # Load trends
         trends = trends_service.get_current_trends()
         
@@ -157,7 +156,7 @@ def analyze_single_product(product_id):
             product_id = f"gid://shopify/Product/{product_id}"
         
         # Fetch the specific product
-        product = product_service.get_product_by_id(product_id)
+        product = get_product_service().get_product_by_id(product_id)
         
         if not product:
             return jsonify({
@@ -166,7 +165,7 @@ def analyze_single_product(product_id):
             }), 404
         
         # Get summary
-        product_summary = product_service.get_product_summary(product)
+        product_summary = get_product_service().get_product_summary(product)
         
         # Load trends
         trends = trends_service.get_current_trends()
@@ -216,7 +215,7 @@ def apply_recommendations(product_id):
         
         # If no recommendations provided, run fresh analysis
         if not recommendations:
-            product = product_service.get_product_by_id(product_id)
+            product = get_product_service().get_product_by_id(product_id)
             
             if not product:
                 return jsonify({
@@ -224,7 +223,7 @@ def apply_recommendations(product_id):
                     'error': 'Product not found'
                 }), 404
             
-            product_summary = product_service.get_product_summary(product)
+            product_summary = get_product_service().get_product_summary(product)
             trends = trends_service.get_current_trends()
             trend_summaries = [trends_service.get_trend_summary(t) for t in trends]
             
@@ -293,7 +292,7 @@ def apply_recommendations(product_id):
         }
         
         # Update the product
-        updated_product = product_service.update_product(product_id, updates)
+        updated_product = get_product_service().update_product(product_id, updates)
         
         return jsonify({
             'success': True,
@@ -333,15 +332,13 @@ def match_products_to_trends():
         
         # Fetch products
         if product_ids:
-            products = []
-            for pid in product_ids:
-                if not pid.startswith('gid://'):
-                    pid = f"gid://shopify/Product/{pid}"
-                product = product_service.get_product_by_id(pid)
-                if product:
-                    products.append(product)
+            product_ids = [
+                pid if pid.startswith('gid://') else f"gid://shopify/Product/{pid}"
+                for pid in product_ids
+            ]
+            products = get_product_service().get_products_by_ids(product_ids)
         else:
-            products = product_service.fetch_products()
+            products = get_product_service().fetch_products(fields='summary')
         
         if not products:
             return jsonify({
@@ -351,7 +348,7 @@ def match_products_to_trends():
         
         # Get product summaries
         product_summaries = [
-            product_service.get_product_summary(p) for p in products
+            get_product_service().get_product_summary(p) for p in products
         ]
         
         # Load trends
@@ -415,18 +412,17 @@ def generate_marketing_for_product(product_id):
             }), 400
         
         # Fetch the product
-        product = product_service.get_product_by_id(product_id)
+        product = get_product_service().get_product_by_id(product_id)
         if not product:
             return jsonify({
                 'success': False,
                 'error': 'Product not found'
             }), 404
         
-        product_summary = product_service.get_product_summary(product)
+        product_summary = get_product_service().get_product_summary(product)
         
-        # Load trends and find the specified one
-        trends = trends_service.get_current_trends()
-        trend = next((t for t in trends if t.get('id') == trend_id), None)
+        # Find the specified trend
+        trend = trends_service.get_trend_by_id(trend_id)
         
         if not trend:
             return jsonify({
@@ -475,15 +471,13 @@ def match_and_generate():
         
         # Step 1: Get products
         if product_ids:
-            products = []
-            for pid in product_ids:
-                if not pid.startswith('gid://'):
-                    pid = f"gid://shopify/Product/{pid}"
-                product = product_service.get_product_by_id(pid)
-                if product:
-                    products.append(product)
+            product_ids = [
+                pid if pid.startswith('gid://') else f"gid://shopify/Product/{pid}"
+                for pid in product_ids
+            ]
+            products = get_product_service().get_products_by_ids(product_ids)
         else:
-            products = product_service.fetch_products()
+            products = get_product_service().fetch_products(fields='summary')
         
         if not products:
             return jsonify({
@@ -491,7 +485,7 @@ def match_and_generate():
                 'error': 'No products found'
             }), 404
         
-        product_summaries = [product_service.get_product_summary(p) for p in products]
+        product_summaries = [get_product_service().get_product_summary(p) for p in products]
         
         # Create lookup dict for product summaries
         products_lookup = {p['id']: p for p in product_summaries}
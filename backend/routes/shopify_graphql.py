@@ -16,6 +16,7 @@ from urllib.parse import urlparse
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import config
+from services.shopify_auth import shopify_auth, REQUEST_TIMEOUT
 
 shopify_graphql_bp = Blueprint('shopify_graphql', __name__)
 
@@ -55,7 +56,7 @@ def proxy_graphql():
         final_url = 'https://' + final_url
 
     try:
-        resp = requests.post(final_url, headers=headers, data=request.get_data(), timeout=30)
+        resp = shopify_auth.session.post(final_url, headers=headers, data=request.get_data(), timeout=REQUEST_TIMEOUT)
     except requests.RequestException as e:
         return jsonify({'error': 'Failed to connect to Shopify', 'details': str(e)}), 502
 
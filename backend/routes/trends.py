@@ -118,13 +118,13 @@ def match_product_to_trends(product_id):
         JSON with matching trends and scores
     """
     try:
-        from services import product_service
+        from services import get_product_service
         
         # Handle URL encoding
         if not product_id.startswith('gid://'):
             product_id = f"gid://shopify/Product/{product_id}"
         
-        product = product_service.get_product_by_id(product_id)
+        product = get_product_service().get_product_by_id(product_id)
         
         if not product:
             return jsonify({
@@ -132,7 +132,7 @@ def match_product_to_trends(product_id):
                 'error': 'Product not found'
             }), 404
         
-        product_summary = product_service.get_product_summary(product)
+        product_summary = get_product_service().get_product_summary(product)
         trends = trends_service.get_current_trends()
         
         # Calculate match scores
@@ -4,27 +4,35 @@ Each service is designed as a stateless class for easy LangGraph node integratio
 """
 
 from .shopify_auth import ShopifyAuth, shopify_auth
-from .product_service import ProductService, product_service
+from .product_service import ProductService, ProductSummary
 from .trends_service import TrendsService, trends_service
 from .ai_optimizer import AIOptimizer
-from .video_analyzer import VideoAnalyzer, video_analyzer
+from .video_analyzer import VideoAnalyzer
 from .trend_matcher import TrendMatcher
 from .marketing_generator import MarketingGenerator
 
 __all__ = [
     'ShopifyAuth', 'shopify_auth',
-    'ProductService', 'product_service', 
+    'ProductService', 'ProductSummary',
     'TrendsService', 'trends_service',
     'AIOptimizer',
-    'VideoAnalyzer', 'video_analyzer',
+    'VideoAnalyzer',
     'TrendMatcher',
     'MarketingGenerator'
 ]
 
 # Lazy singletons to avoid initializing external SDKs at import time
+_product_service = None
 _ai_optimizer = None
 _trend_matcher = None
 _marketing_generator = None
+_video_analyzer = None
+
+def get_product_service() -> ProductService:
+    global _product_service
+    if _product_service is None:
+        _product_service = ProductService()
+    return _product_service
 
 def get_ai_optimizer() -> AIOptimizer:
     global _ai_optimizer
@@ -44,7 +52,14 @@ def get_marketing_generator() -> MarketingGenerator:
         _marketing_generator = MarketingGenerator()
     return _marketing_generator
 
+def get_video_analyzer() -> VideoAnalyzer:
+    global _video_analyzer
+    if _video_analyzer is None:
+        _video_analyzer = VideoAnalyzer()
+    return _video_analyzer
+
 # Backwards-compatible exports (callables)
 __all__.extend([
-    'get_ai_optimizer', 'get_trend_matcher', 'get_marketing_generator'
+    'get_product_service', 'get_ai_optimizer', 'get_trend_matcher', 'get_marketing_generator',
+    'get_video_analyzer'
 ])
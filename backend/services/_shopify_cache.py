@@ -0,0 +1,187 @@
+"""
+Shopify Response Cache.
+Small in-process cache with stale-while-revalidate semantics for
+read-only Shopify GraphQL calls. Entries are tagged (e.g. by product ID)
+so writes can invalidate every cached read that contains the product.
+Callers always get their own deep copy, so mutating a result never
+changes what is cached.
+"""
+
+import copy
+import functools
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+class SWRCache:
+    """
+    Thread-safe LRU cache whose entries carry a timestamp and a set of tags.
+    Freshness is decided by the caller (see swr_cache) from the entry age.
+
+    Every invalidation bumps a generation counter. Loads record the
+    generation they started under and pass it to set(), so a load that was
+    already in flight when its data was invalidated is not written back.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[Any, float, frozenset]]" = OrderedDict()
+        self._refreshing = set()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped by every invalidate() and clear()."""
+        with self._lock:
+            return self._generation
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Look up a cached value.
+
+        Returns:
+            (copy_of_value, age_seconds) or None if the key is not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            value, stored_at, _ = entry
+        return copy.deepcopy(value), time.monotonic() - stored_at
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        tags: Iterable[str] = (),
+        generation: Optional[int] = None
+    ) -> bool:
+        """
+        Store a copy of value, evicting the least recently used entry when full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            tags: Invalidation tags for the entry
+            generation: Generation the value was loaded under; the value is
+                dropped if the cache has been invalidated since
+
+        Returns:
+            True if the value was stored
+        """
+        value = copy.deepcopy(value)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._entries[key] = (value, time.monotonic(), frozenset(tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, tag: str) -> int:
+        """
+        Drop every entry carrying the given tag.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, (_, _, tags) in self._entries.items() if tag in tags]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def refresh_in_background(self, key: str, loader: Callable[[], Any]) -> None:
+        """Run loader on a daemon thread unless a refresh for key is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                loader()
+            except Exception as e:
+                print(f'⚠️ Background refresh failed: {e}')
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+
+# Shared cache for all Shopify reads
+shopify_cache = SWRCache()
+
+
+def _cache_scope(instance: Any) -> str:
+    """Identify the store a service instance talks to, falling back to the instance itself."""
+    store_domain = getattr(getattr(instance, '_config', None), 'store_domain', None)
+    return store_domain or f'{type(instance).__qualname__}@{id(instance)}'
+
+
+def _cache_key(scope: str, name: str, args: tuple, kwargs: Dict[str, Any]) -> str:
+    """Stable digest of a call signature."""
+    raw = json.dumps([scope, name, args, kwargs], sort_keys=True, default=str)
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def swr_cache(
+    ttl: float = 300,
+    swr: float = 60,
+    tags: Optional[Callable[[Any], Iterable[str]]] = None
+):
+    """
+    Cache a read-only service method with stale-while-revalidate semantics.
+
+    Within `ttl` seconds the cached value is returned directly. For a further
+    `swr` seconds the stale value is returned while a background thread
+    refreshes it. Older entries are reloaded synchronously. None results
+    are never cached. Entries are scoped to the instance's store, and a
+    load that overlaps an invalidation is returned but not cached.
+
+    Args:
+        ttl: Seconds a cached value is considered fresh
+        swr: Extra seconds a stale value may be served while revalidating
+        tags: Optional callable mapping the result to invalidation tags
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = _cache_key(_cache_scope(self), func.__qualname__, args, kwargs)
+
+            def load():
+                generation = shopify_cache.generation
+                value = func(self, *args, **kwargs)
+                if value is not None:
+                    shopify_cache.set(key, value, tags(value) if tags else (), generation)
+                return value
+
+            hit = shopify_cache.get(key)
+            if hit is not None:
+                value, age = hit
+                if age < ttl:
+                    return value
+                if age < ttl + swr:
+                    shopify_cache.refresh_in_background(key, load)
+                    return value
+
+            return load()
+
+        return wrapper
+
+    return decorator
@@ -11,6 +11,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import config
+from utils.helpers import strip_code_fence
 
 # Conditional import for Gemini
 try:
@@ -179,16 +180,7 @@ Return ONLY the JSON array, no other text."""
     
     def _clean_response(self, response_text: str) -> str:
         """Clean Gemini response by removing markdown code blocks."""
-        text = response_text.strip()
-        
-        if text.startswith('```json'):
-            text = text[7:]
-        if text.startswith('```'):
-            text = text[3:]
-        if text.endswith('```'):
-            text = text[:-3]
-        
-        return text.strip()
+        return strip_code_fence(response_text)
 
     def _call_genai(self, prompt: str) -> str:
         """
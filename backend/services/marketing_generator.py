@@ -5,12 +5,14 @@ Designed as a stateless service for LangGraph integration.
 """
 
 import json
+from functools import lru_cache
 from typing import Dict, Any, Optional, List
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import config
+from utils.helpers import strip_code_fence
 
 # Conditional import for Gemini
 try:
@@ -20,6 +22,50 @@ except ImportError:
     GEMINI_AVAILABLE = False
     print("⚠️ google-generativeai not installed. Using template-based generation.")
 
+# Only these fields are sent to Gemini; images, variants and HTML are dropped
+_PRODUCT_FIELDS = ('id', 'title', 'description', 'type', 'productType', 'price', 'tags', 'vendor')
+_TREND_FIELDS = ('id', 'name', 'keywords', 'marketing_angle', 'color_palette', 'hashtags')
+_MAX_DESCRIPTION_CHARS = 1000
+
+
+@lru_cache(maxsize=1)
+def _resolve_invoker(api_key: str):
+    """
+    Probe the installed Gemini SDK once and return a model or client.
+    Cached so repeated MarketingGenerator instances share the same invoker.
+    
+    Args:
+        api_key: Gemini API key
+        
+    Returns:
+        GenerativeModel, genai Client, or None if no compatible SDK is found
+    """
+    try:
+        os.environ.setdefault('GENAI_API_KEY', api_key)
+        if hasattr(genai, 'GenerativeModel'):
+            model = genai.GenerativeModel('gemini-pro')
+            print("✅ Marketing Generator: Gemini AI initialized")
+            return model
+        
+        Client = getattr(genai, 'Client', None)
+        if Client is None:
+            print("⚠️ Marketing Generator: google-genai present but no compatible model found")
+            return None
+        
+        try:
+            try:
+                client = Client(api_key=api_key)
+            except TypeError:
+                client = Client()
+            print("✅ Marketing Generator: Gemini client initialized")
+            return client
+        except Exception as e:
+            print("⚠️ Marketing Generator: Gemini client failed to initialize:", e)
+            return None
+    except Exception as e:
+        print("⚠️ Marketing Generator init failed:", e)
+        return None
+
 
 class MarketingGenerator:
     """
@@ -32,31 +78,7 @@ class MarketingGenerator:
         self._model = None
         
         if GEMINI_AVAILABLE and self._config.gemini_api_key:
-            try:
-                os.environ.setdefault('GENAI_API_KEY', self._config.gemini_api_key)
-                if hasattr(genai, 'GenerativeModel'):
-                    self._model = genai.GenerativeModel('gemini-pro')
-                    print("✅ Marketing Generator: Gemini AI initialized")
-                else:
-                    Client = getattr(genai, 'Client', None)
-                    if Client is not None:
-                        try:
-                            try:
-                                client = Client(api_key=self._config.gemini_api_key)
-                            except TypeError:
-                                client = Client()
-
-                            self._model = client
-                            print("✅ Marketing Generator: Gemini client initialized")
-                        except Exception as e:
-                            self._model = None
-                            print("⚠️ Marketing Generator: Gemini client failed to initialize:", e)
-                    else:
-                        self._model = None
-                        print("⚠️ Marketing Generator: google-genai present but no compatible model found")
-            except Exception as e:
-                self._model = None
-                print("⚠️ Marketing Generator init failed:", e)
+            self._model = _resolve_invoker(self._config.gemini_api_key)
         else:
             print("⚠️ Marketing Generator: Using template-based generation")
     
@@ -203,8 +225,13 @@ class MarketingGenerator:
     ) -> str:
         """Build the prompt for marketing generation."""
         
-        product_json = json.dumps(product, indent=2)
-        trend_json = json.dumps(trend, indent=2)
+        product_lean = {k: product[k] for k in _PRODUCT_FIELDS if k in product}
+        if isinstance(product_lean.get('description'), str):
+            product_lean['description'] = product_lean['description'][:_MAX_DESCRIPTION_CHARS]
+        trend_lean = {k: trend[k] for k in _TREND_FIELDS if k in trend}
+        
+        product_json = json.dumps(product_lean, separators=(',', ':'), ensure_ascii=False)
+        trend_json = json.dumps(trend_lean, separators=(',', ':'), ensure_ascii=False)
         trend_name = trend.get('name', 'the trend')
         trend_id = trend.get('id', 'trend')
         
@@ -264,16 +291,7 @@ Return ONLY valid JSON, no other text or explanation."""
     
     def _clean_response(self, response_text: str) -> str:
         """Clean Gemini response by removing markdown code blocks."""
-        text = response_text.strip()
-        
-        if text.startswith('```json'):
-            text = text[7:]
-        if text.startswith('```'):
-            text = text[3:]
-        if text.endswith('```'):
-            text = text[:-3]
-        
-        return text.strip()
+        return strip_code_fence(response_text)
     
     def _template_generate(
         self,
@@ -4,14 +4,422 @@ Handles CRUD operations for Shopify products via GraphQL API.
 Designed as a stateless service for LangGraph integration.
 """
 
+import io
+import json
+import time
 import requests
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import config
-from .shopify_auth import shopify_auth
+from .shopify_auth import shopify_auth, REQUEST_TIMEOUT
+from ._shopify_cache import shopify_cache, swr_cache
+
+# Conditional import for streaming JSON parsing
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Conditional import for faster JSON encoding/decoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+# GraphQL documents
+FETCH_PRODUCTS_QUERY = """
+query FetchProducts($first: Int!, $after: String) {
+  products(first: $first, after: $after) {
+    edges {
+      node {
+        id
+        title
+        description
+        descriptionHtml
+        handle
+        productType
+        tags
+        vendor
+        status
+        createdAt
+        updatedAt
+        seo {
+          title
+          description
+        }
+        images(first: 5) {
+          edges {
+            node {
+              id
+              url
+              altText
+            }
+          }
+        }
+        variants(first: 5) {
+          edges {
+            node {
+              id
+              title
+              price
+              sku
+              inventoryQuantity
+            }
+          }
+        }
+        metafields(first: 20, namespace: "ai_optimizer") {
+          edges {
+            node {
+              namespace
+              key
+              value
+              type
+            }
+          }
+        }
+      }
+    }
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+  }
+}
+"""
+
+# Only the fields ProductSummary reads; images are fetched as IDs for the count
+FETCH_PRODUCTS_SUMMARY_QUERY = """
+query FetchProductSummaries($first: Int!, $after: String) {
+  products(first: $first, after: $after) {
+    edges {
+      node {
+        id
+        title
+        description
+        productType
+        tags
+        vendor
+        status
+        updatedAt
+        seo {
+          title
+        }
+        images(first: 5) {
+          edges {
+            node {
+              id
+            }
+          }
+        }
+        variants(first: 1) {
+          edges {
+            node {
+              price
+            }
+          }
+        }
+      }
+    }
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+  }
+}
+"""
+
+GET_PRODUCT_QUERY = """
+query GetProduct($id: ID!) {
+  product(id: $id) {
+    id
+    title
+    description
+    descriptionHtml
+    handle
+    productType
+    tags
+    vendor
+    status
+    updatedAt
+    seo {
+      title
+      description
+    }
+    images(first: 5) {
+      edges {
+        node {
+          id
+          url
+          altText
+        }
+      }
+    }
+    variants(first: 5) {
+      edges {
+        node {
+          id
+          title
+          price
+          sku
+        }
+      }
+    }
+    metafields(first: 20, namespace: "ai_optimizer") {
+      edges {
+        node {
+          namespace
+          key
+          value
+          type
+        }
+      }
+    }
+  }
+}
+"""
+
+UPDATE_PRODUCT_MUTATION = """
+mutation UpdateProduct($input: ProductInput!) {
+  productUpdate(input: $input) {
+    product {
+      id
+      title
+      descriptionHtml
+      seo {
+        title
+        description
+      }
+      metafields(first: 20, namespace: "ai_optimizer") {
+        edges {
+          node {
+            namespace
+            key
+            value
+          }
+        }
+      }
+    }
+    userErrors {
+      field
+      message
+    }
+  }
+}
+"""
+
+STAGED_UPLOADS_MUTATION = """
+mutation StagedUploadsCreate($input: [StagedUploadInput!]!) {
+  stagedUploadsCreate(input: $input) {
+    stagedTargets {
+      url
+      resourceUrl
+      parameters {
+        name
+        value
+      }
+    }
+    userErrors {
+      field
+      message
+    }
+  }
+}
+"""
+
+PRODUCT_CREATE_MEDIA_MUTATION = """
+mutation ProductCreateMedia($productId: ID!, $media: [CreateMediaInput!]!) {
+  productCreateMedia(productId: $productId, media: $media) {
+    media {
+      alt
+      mediaContentType
+      status
+      ... on MediaImage {
+        id
+        image {
+          url
+        }
+      }
+    }
+    mediaUserErrors {
+      field
+      message
+    }
+  }
+}
+"""
+
+# Maximum number of product revisions kept in the summary cache
+_SUMMARY_CACHE_SIZE = 1024
+
+# Shopify cost-bucket points to keep in reserve before dispatching another update
+_THROTTLE_MIN_AVAILABLE = 100
+
+# productUpdate calls aliased into one document by update_products; about
+# ten keeps a document well inside Shopify's single-query cost limit
+_BATCHED_UPDATE_SIZE = 10
+
+# Selection set returned for each aliased productUpdate (same shape as UPDATE_PRODUCT_MUTATION)
+_BATCHED_UPDATE_SELECTION = (
+    '{ product { id title descriptionHtml seo { title description } '
+    'metafields(first: 20, namespace: "ai_optimizer") { edges { node { namespace key value } } } } '
+    'userErrors { field message } }'
+)
+
+
+@lru_cache(maxsize=16)
+def _batched_update_mutation(size: int) -> str:
+    """
+    Build a mutation with `size` aliased productUpdate calls (u0..uN over $i0..$iN).
+    Cached per size so the document is built once.
+    """
+    params = ', '.join(f'$i{n}: ProductInput!' for n in range(size))
+    fields = '\n'.join(
+        f'  u{n}: productUpdate(input: $i{n}) {_BATCHED_UPDATE_SELECTION}' for n in range(size)
+    )
+    return f"mutation BatchUpdateProducts({params}) {{\n{fields}\n}}\n"
+
+# Product listing queries by field set, for fetch_products(fields=...)
+_PRODUCT_LIST_QUERIES = {
+    'full': FETCH_PRODUCTS_QUERY,
+    'summary': FETCH_PRODUCTS_SUMMARY_QUERY
+}
+
+# Paths of each product node and of the page cursor inside the fetch_products response
+_PRODUCT_NODE_PATH = 'data.products.edges.item.node'
+_PAGE_INFO_PATH = 'data.products.pageInfo'
+
+# Shopify caps `first` on a connection at 250
+_MAX_PAGE_SIZE = 250
+
+
+class GraphQLError(Exception):
+    """Raised when a Shopify GraphQL response carries top-level errors."""
+    
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__(f"GraphQL errors: {errors}")
+        self.errors = errors
+
+
+def _is_throttled(error: Optional[BaseException]) -> bool:
+    """
+    Check whether an exception (or one it wraps) was caused by Shopify rate limiting.
+    Throttled requests were rejected before execution, so resending a mutation is safe.
+    """
+    while error is not None:
+        if isinstance(error, GraphQLError):
+            for item in error.errors:
+                if isinstance(item, dict) and (item.get('extensions') or {}).get('code') == 'THROTTLED':
+                    return True
+        response = getattr(error, 'response', None)
+        if response is not None and response.status_code == 429:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _iter_streamed_nodes(
+    raw,
+    prefix: str,
+    collect: Optional[Dict[str, Any]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parse a GraphQL response body and yield each object at `prefix`.
+    Only one node is materialized at a time. Objects at any other path that is
+    a key of `collect` are stored there instead of yielded. A top-level
+    `errors` array is collected as it streams past and raised once parsing finishes.
+    """
+    node_builder = None
+    node_path = None
+    errors_builder = None
+    
+    for path, event, value in ijson.parse(raw, use_float=True):
+        if errors_builder is not None:
+            errors_builder.event(event, value)
+            if path == 'errors' and event == 'end_array':
+                raise GraphQLError(errors_builder.value)
+            continue
+        if path == 'errors' and event == 'start_array':
+            errors_builder = ijson.ObjectBuilder()
+            errors_builder.event(event, value)
+            continue
+        
+        if node_builder is None:
+            if event == 'start_map' and (path == prefix or (collect is not None and path in collect)):
+                node_builder = ijson.ObjectBuilder()
+                node_builder.event(event, value)
+                node_path = path
+            continue
+        
+        node_builder.event(event, value)
+        if path == node_path and event == 'end_map':
+            if node_path == prefix:
+                yield node_builder.value
+            else:
+                collect[node_path] = node_builder.value
+            node_builder = None
+
+
+@dataclass(slots=True, frozen=True)
+class ProductSummary:
+    """
+    Flattened, immutable view of a product used for AI analysis.
+    """
+    id: str
+    title: str
+    type: str
+    description: str
+    price: float
+    tags: List[str]
+    vendor: str
+    status: str
+    image_count: int
+    has_seo: bool
+    
+    @classmethod
+    def from_product(cls, product: Dict[str, Any]) -> 'ProductSummary':
+        """Build a summary from a raw Shopify product node."""
+        variants = (product.get('variants') or {}).get('edges')
+        price = float(variants[0]['node'].get('price') or 0) if variants else 0.0
+        
+        # Partial nodes (e.g. from the 'basic' field set) may omit any field
+        return cls(
+            product.get('id'),
+            product.get('title', ''),
+            product.get('productType', ''),
+            product.get('description', ''),
+            price,
+            product.get('tags', []),
+            product.get('vendor', ''),
+            product.get('status', ''),
+            len((product.get('images') or {}).get('edges') or ()),
+            bool((product.get('seo') or {}).get('title'))
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the summary as a JSON-serializable dictionary."""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'type': self.type,
+            'description': self.description,
+            'price': self.price,
+            'tags': self.tags,
+            'vendor': self.vendor,
+            'status': self.status,
+            'image_count': self.image_count,
+            'has_seo': self.has_seo
+        }
 
 
 class ProductService:
@@ -20,16 +428,50 @@ class ProductService:
     All methods are stateless and can be used as LangGraph nodes.
     """
     
+    __slots__ = (
+        '_config', '_auth', '_session', '_throttle_status', '_summary_cache'
+    )
+    
     def __init__(self):
         self._config = config.shopify
         self._auth = shopify_auth
+        
+        # Keep-alive session shared with auth so calls reuse TCP/TLS connections.
+        # Auth headers are still passed per request in case the token rotates.
+        self._session = self._auth.session
+        
+        # Latest extensions.cost.throttleStatus reported by Shopify
+        self._throttle_status: Optional[Dict[str, Any]] = None
+        # ProductSummary per (id, updatedAt) revision
+        self._summary_cache: Dict[Tuple[str, str], ProductSummary] = {}
+    
+    def _post_graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a GraphQL document and return the decoded response body."""
+        response = self._session.post(
+            self._config.graphql_url,
+            json={'query': query, 'variables': variables},
+            headers=self._auth.get_headers(),
+            timeout=REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+        
+        data = _json_loads(response.content)
+        cost = (data.get('extensions') or {}).get('cost') or {}
+        if cost.get('throttleStatus'):
+            self._throttle_status = cost['throttleStatus']
+        if data.get('errors') and data.get('data') is None:
+            raise GraphQLError(data['errors'])
+        return data
     
-    def fetch_products(self, limit: int = 50) -> List[Dict[str, Any]]:
+    @swr_cache(ttl=300, swr=60, tags=lambda products: ['products', *(p['id'] for p in products)])
+    def fetch_products(self, limit: int = 50, fields: str = 'full') -> List[Dict[str, Any]]:
         """
         Fetch products from Shopify.
         
         Args:
             limit: Maximum number of products to fetch (default 50)
+            fields: 'full' for complete product nodes, or 'summary' for only
+                the fields needed by get_product_summary
             
         Returns:
             List of product dictionaries
@@ -37,83 +479,81 @@ class ProductService:
         Raises:
             Exception: If API request fails
         """
-        query = """
-        query FetchProducts($first: Int!) {
-          products(first: $first) {
-            edges {
-              node {
-                id
-                title
-                description
-                descriptionHtml
-                handle
-                productType
-                tags
-                vendor
-                status
-                createdAt
-                updatedAt
-                seo {
-                  title
-                  description
-                }
-                images(first: 5) {
-                  edges {
-                    node {
-                      id
-                      url
-                      altText
-                    }
-                  }
-                }
-                variants(first: 5) {
-                  edges {
-                    node {
-                      id
-                      title
-                      price
-                      sku
-                      inventoryQuantity
-                    }
-                  }
-                }
-                metafields(first: 20, namespace: "ai_optimizer") {
-                  edges {
-                    node {
-                      namespace
-                      key
-                      value
-                      type
-                    }
-                  }
-                }
-              }
-            }
-          }
-        }
+        products = list(self.iter_products(limit, fields))
+        print(f'✅ Fetched {len(products)} products')
+        return products
+    
+    def iter_products(self, limit: int = 50, fields: str = 'full') -> Iterator[Dict[str, Any]]:
         """
+        Stream products from Shopify one at a time.
         
-        try:
-            response = requests.post(
-                self._config.graphql_url,
-                json={'query': query, 'variables': {'first': limit}},
-                headers=self._auth.get_headers()
-            )
-            response.raise_for_status()
-            
-            data = response.json()
+        Products are requested in cursor-paginated pages. When ijson is
+        installed each page is parsed incrementally, so only a single product
+        node is held in memory at once; otherwise the page is decoded in one
+        go. A null `data` yields no products.
+        
+        Args:
+            limit: Maximum number of products to yield (default 50)
+            fields: 'full' or 'summary' (see fetch_products)
             
-            if 'errors' in data:
-                raise Exception(f"GraphQL errors: {data['errors']}")
+        Yields:
+            Product dictionaries
             
-            products = [edge['node'] for edge in data['data']['products']['edges']]
-            print(f'✅ Fetched {len(products)} products')
-            return products
+        Raises:
+            Exception: If API request fails or fields is unknown
+        """
+        if fields not in _PRODUCT_LIST_QUERIES:
+            raise Exception(f"Unknown product field set: {fields}")
+        
+        query = _PRODUCT_LIST_QUERIES[fields]
+        remaining = limit
+        cursor = None
+        
+        try:
+            while remaining > 0:
+                page = {_PAGE_INFO_PATH: None}
+                payload = {
+                    'query': query,
+                    'variables': {'first': min(remaining, _MAX_PAGE_SIZE), 'after': cursor}
+                }
+                
+                with self._session.post(
+                    self._config.graphql_url,
+                    json=payload,
+                    headers=self._auth.get_headers(),
+                    timeout=REQUEST_TIMEOUT,
+                    stream=True
+                ) as response:
+                    response.raise_for_status()
+                    
+                    if IJSON_AVAILABLE:
+                        response.raw.decode_content = True
+                        nodes = _iter_streamed_nodes(response.raw, _PRODUCT_NODE_PATH, page)
+                    else:
+                        data = _json_loads(response.content)
+                        if data.get('errors'):
+                            raise GraphQLError(data['errors'])
+                        # `data` (or `products`) is null when the query was rejected
+                        products = (data.get('data') or {}).get('products') or {}
+                        page[_PAGE_INFO_PATH] = products.get('pageInfo')
+                        nodes = (edge['node'] for edge in products.get('edges') or [])
+                    
+                    for node in nodes:
+                        remaining -= 1
+                        yield node
+                
+                # The cursor only moves once the whole page has been consumed,
+                # so no product is yielded twice
+                page_info = page[_PAGE_INFO_PATH] or {}
+                if not page_info.get('hasNextPage'):
+                    break
+                cursor = page_info.get('endCursor')
             
         except requests.exceptions.RequestException as e:
             print(f'❌ Error fetching products: {e}')
             raise Exception(f"Failed to fetch products: {e}")
     
+    @swr_cache(ttl=300, swr=60, tags=lambda product: [product['id']])
     def get_product_by_id(self, product_id: str) -> Optional[Dict[str, Any]]:
         """
         Fetch a single product by ID.
@@ -124,70 +564,40 @@ class ProductService:
         Returns:
             Product dictionary or None if not found
         """
-        query = """
-        query GetProduct($id: ID!) {
-          product(id: $id) {
-            id
-            title
-            description
-            descriptionHtml
-            handle
-            productType
-            tags
-            vendor
-            status
-            seo {
-              title
-              description
-            }
-            images(first: 5) {
-              edges {
-                node {
-                  id
-                  url
-                  altText
-                }
-              }
-            }
-            variants(first: 5) {
-              edges {
-                node {
-                  id
-                  title
-                  price
-                  sku
-                }
-              }
-            }
-            metafields(first: 20, namespace: "ai_optimizer") {
-              edges {
-                node {
-                  namespace
-                  key
-                  value
-                  type
-                }
-              }
-            }
-          }
-        }
-        """
-        
         try:
-            response = requests.post(
-                self._config.graphql_url,
-                json={'query': query, 'variables': {'id': product_id}},
-                headers=self._auth.get_headers()
-            )
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._post_graphql(GET_PRODUCT_QUERY, {'id': product_id})
             return data['data'].get('product')
             
         except Exception as e:
             print(f'❌ Error fetching product {product_id}: {e}')
             return None
     
+    def get_products_by_ids(
+        self,
+        product_ids: List[str],
+        workers: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch several products concurrently.
+        
+        Each lookup runs get_product_by_id on a worker thread over the shared
+        connection pool, so N lookups take roughly one round-trip instead of N.
+        Safe to call from inside a running event loop.
+        
+        Args:
+            product_ids: Shopify product GIDs
+            workers: Maximum number of requests in flight
+            
+        Returns:
+            List of found product dictionaries, in input order
+        """
+        if not product_ids:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(workers, len(product_ids))) as executor:
+            products = list(executor.map(self.get_product_by_id, product_ids))
+        return [p for p in products if p]
+    
     def update_product(self, product_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
         """
         Update a product with new data.
@@ -202,35 +612,6 @@ class ProductService:
         Raises:
             Exception: If update fails
         """
-        mutation = """
-        mutation UpdateProduct($input: ProductInput!) {
-          productUpdate(input: $input) {
-            product {
-              id
-              title
-              descriptionHtml
-              seo {
-                title
-                description
-              }
-              metafields(first: 20, namespace: "ai_optimizer") {
-                edges {
-                  node {
-                    namespace
-                    key
-                    value
-                  }
-                }
-              }
-            }
-            userErrors {
-              field
-              message
-            }
-          }
-        }
-        """
-        
         variables = {
             'input': {
                 'id': product_id,
@@ -239,19 +620,13 @@ class ProductService:
         }
         
         try:
-            response = requests.post(
-                self._config.graphql_url,
-                json={'query': mutation, 'variables': variables},
-                headers=self._auth.get_headers()
-            )
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._post_graphql(UPDATE_PRODUCT_MUTATION, variables)
             
             if data['data']['productUpdate']['userErrors']:
                 errors = data['data']['productUpdate']['userErrors']
                 raise Exception(f"Update errors: {errors}")
             
+            shopify_cache.invalidate(product_id)
             print(f'✅ Product {product_id} updated successfully')
             return data['data']['productUpdate']['product']
             
@@ -259,6 +634,208 @@ class ProductService:
             print(f'❌ Error updating product: {e}')
             raise Exception(f"Failed to update product: {e}")
     
+    def _wait_for_throttle_budget(self) -> None:
+        """Sleep until Shopify's cost bucket has refilled above the reserve threshold."""
+        status = self._throttle_status
+        if not status:
+            return
+        
+        available = status.get('currentlyAvailable', _THROTTLE_MIN_AVAILABLE)
+        if available >= _THROTTLE_MIN_AVAILABLE:
+            return
+        
+        restore_rate = status.get('restoreRate') or 50
+        time.sleep((_THROTTLE_MIN_AVAILABLE - available) / restore_rate)
+    
+    def update_products(
+        self,
+        updates: List[Tuple[str, Dict[str, Any]]],
+        chunk_size: int = _BATCHED_UPDATE_SIZE,
+        workers: int = 8,
+        max_retries: int = 4
+    ) -> List[Dict[str, Any]]:
+        """
+        Apply many product updates with aliased productUpdate mutations.
+        
+        Updates targeting the same product are merged, then sent `chunk_size`
+        per request as aliased mutations (u0..uN) and mapped back by alias.
+        Dispatch pauses while Shopify's cost bucket is low, and throttled
+        requests are retried with exponential backoff. This is the only retry
+        layer: the shared session never resends POSTs. If a chunk fails as a
+        whole for any other reason, its products are sent once more one at a
+        time on a thread pool; per-product userErrors are reported as-is.
+        
+        Args:
+            updates: List of (product_id, fields) tuples
+            chunk_size: Number of aliased mutations per request
+            workers: Number of worker threads for the per-product fallback
+            max_retries: Retries per request when throttled
+            
+        Returns:
+            List of result dictionaries, one per distinct product ID
+        """
+        merged: Dict[str, Dict[str, Any]] = {}
+        for product_id, fields in updates:
+            merged.setdefault(product_id, {}).update(fields)
+        items = list(merged.items())
+        
+        def run(item: Tuple[str, Dict[str, Any]]) -> Dict[str, Any]:
+            product_id, fields = item
+            for attempt in range(max_retries + 1):
+                self._wait_for_throttle_budget()
+                try:
+                    product = self.update_product(product_id, fields)
+                    return {'product_id': product_id, 'success': True, 'product': product}
+                except Exception as e:
+                    if attempt < max_retries and _is_throttled(e):
+                        time.sleep(0.5 * 2 ** attempt)
+                        continue
+                    return {'product_id': product_id, 'success': False, 'error': str(e)}
+        
+        results = []
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            document = _batched_update_mutation(len(chunk))
+            variables = {
+                f'i{n}': {'id': product_id, **fields}
+                for n, (product_id, fields) in enumerate(chunk)
+            }
+            
+            payload = None
+            for attempt in range(max_retries + 1):
+                self._wait_for_throttle_budget()
+                try:
+                    payload = self._post_graphql(document, variables)['data']
+                    break
+                except Exception as e:
+                    if attempt < max_retries and _is_throttled(e):
+                        time.sleep(0.5 * 2 ** attempt)
+                        continue
+                    print(f'⚠️ Batched update failed, falling back to single updates: {e}')
+                    break
+            
+            if payload is None:
+                with ThreadPoolExecutor(max_workers=min(workers, len(chunk))) as executor:
+                    results.extend(executor.map(run, chunk))
+                continue
+            
+            for n, (product_id, _) in enumerate(chunk):
+                result = payload.get(f'u{n}')
+                if not result:
+                    results.append({'product_id': product_id, 'success': False, 'error': 'No result returned'})
+                elif result['userErrors']:
+                    results.append({'product_id': product_id, 'success': False, 'error': f"Update errors: {result['userErrors']}"})
+                else:
+                    shopify_cache.invalidate(product_id)
+                    results.append({'product_id': product_id, 'success': True, 'product': result['product']})
+        
+        failed = sum(1 for r in results if not r['success'])
+        print(f'✅ Updated {len(results) - failed}/{len(results)} products in batches of {chunk_size}')
+        return results
+    
+    def add_product_image_from_bytes(
+        self,
+        product_id: str,
+        image_bytes: bytes,
+        filename: str,
+        mime_type: str = 'image/jpeg',
+        alt: str = ''
+    ) -> Dict[str, Any]:
+        """
+        Attach an image to a product by uploading the raw bytes.
+        
+        The image is PUT to a Shopify staged upload target as a streamed
+        binary body (no base64 or JSON wrapping), then attached with
+        productCreateMedia using the returned resource URL.
+        
+        Args:
+            product_id: Shopify product GID
+            image_bytes: Raw image file contents
+            filename: File name reported to Shopify
+            mime_type: Image MIME type
+            alt: Optional alt text
+            
+        Returns:
+            Created media data
+            
+        Raises:
+            Exception: If the upload or media creation fails
+        """
+        try:
+            data = self._post_graphql(STAGED_UPLOADS_MUTATION, {
+                'input': [{
+                    'resource': 'IMAGE',
+                    'filename': filename,
+                    'mimeType': mime_type,
+                    'fileSize': str(len(image_bytes)),
+                    'httpMethod': 'PUT'
+                }]
+            })
+            result = data['data']['stagedUploadsCreate']
+            if result['userErrors']:
+                raise Exception(f"Staged upload errors: {result['userErrors']}")
+            
+            target = result['stagedTargets'][0]
+            headers = {p['name']: p['value'] for p in target['parameters']}
+            headers.setdefault('Content-Type', mime_type)
+            
+            # A file-like body is sent in blocks with a known Content-Length
+            response = self._session.put(
+                target['url'],
+                data=io.BytesIO(image_bytes),
+                headers=headers,
+                timeout=REQUEST_TIMEOUT
+            )
+            response.raise_for_status()
+            
+            data = self._post_graphql(PRODUCT_CREATE_MEDIA_MUTATION, {
+                'productId': product_id,
+                'media': [{
+                    'originalSource': target['resourceUrl'],
+                    'mediaContentType': 'IMAGE',
+                    'alt': alt
+                }]
+            })
+            result = data['data']['productCreateMedia']
+            if result['mediaUserErrors']:
+                raise Exception(f"Media errors: {result['mediaUserErrors']}")
+            
+            shopify_cache.invalidate(product_id)
+            print(f'✅ Image {filename} added to product {product_id}')
+            return result['media'][0] if result['media'] else {}
+            
+        except requests.exceptions.RequestException as e:
+            print(f'❌ Error uploading product image: {e}')
+            raise Exception(f"Failed to upload product image: {e}")
+    
+    def summarize_product(self, product: Dict[str, Any]) -> ProductSummary:
+        """
+        Flatten a product into a compact ProductSummary.
+        
+        Summaries are cached by product ID and updatedAt, so the same
+        revision is only flattened once. Products without updatedAt are
+        not cached.
+        
+        Args:
+            product: Full product data
+            
+        Returns:
+            ProductSummary instance
+        """
+        updated_at = product.get('updatedAt')
+        if not updated_at:
+            return ProductSummary.from_product(product)
+        
+        key = (product.get('id'), updated_at)
+        summary = self._summary_cache.get(key)
+        if summary is None:
+            summary = ProductSummary.from_product(product)
+            if len(self._summary_cache) >= _SUMMARY_CACHE_SIZE:
+                # Evict the oldest entry (dicts keep insertion order)
+                self._summary_cache.pop(next(iter(self._summary_cache)), None)
+            self._summary_cache[key] = summary
+        return summary
+    
     def get_product_summary(self, product: Dict[str, Any]) -> Dict[str, Any]:
         """
         Extract a summary of product data for AI analysis.
@@ -269,23 +846,8 @@ class ProductService:
         Returns:
             Simplified product summary
         """
-        price = 0.0
-        if product.get('variants', {}).get('edges'):
-            price = float(product['variants']['edges'][0]['node'].get('price', 0))
-        
-        return {
-            'id': product['id'],
-            'title': product.get('title', ''),
-            'type': product.get('productType', ''),
-            'description': product.get('description', ''),
-            'price': price,
-            'tags': product.get('tags', []),
-            'vendor': product.get('vendor', ''),
-            'status': product.get('status', ''),
-            'image_count': len(product.get('images', {}).get('edges', [])),
-            'has_seo': bool(product.get('seo', {}).get('title'))
-        }
-
+        return self.summarize_product(product).to_dict()
 
-# Global singleton instance
-product_service = ProductService()
+# Note: Do not instantiate at import time so importing this module does not
+# touch config.shopify or fetch auth tokens. Use services.get_product_service()
+# to obtain a lazily-initialized singleton.
@@ -4,7 +4,11 @@ Handles OAuth token management and API authentication.
 Designed as a stateless service for LangGraph integration.
 """
 
+import json
+import tempfile
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 from typing import Optional
 import sys
@@ -13,6 +17,22 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import config
 
+# Conditional import for cross-process file locking (POSIX only)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# (connect, read) timeout in seconds for every Shopify request
+REQUEST_TIMEOUT = (5, 30)
+
+# OAuth tokens are persisted here so restarted workers can reuse them
+TOKEN_CACHE_PATH = os.environ.get(
+    'SHOPIFY_TOKEN_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'shopify_token.json')
+)
+
 
 class ShopifyAuth:
     """
@@ -20,10 +40,38 @@ class ShopifyAuth:
     Supports both access token and OAuth client credentials flow.
     """
     
+    __slots__ = ('_access_token', '_token_expiry', '_config', '_session', '_headers_cache')
+    
     def __init__(self):
         self._access_token: Optional[str] = None
         self._token_expiry: Optional[datetime] = None
         self._config = config.shopify
+        self._session: Optional[requests.Session] = None
+        self._headers_cache: Optional[dict] = None
+    
+    @property
+    def session(self) -> requests.Session:
+        """
+        Shared keep-alive session for all Shopify HTTP calls.
+        Retries 429/502/503/504 with backoff for urllib3's default
+        (idempotent) methods only, so POSTed mutations are never resent.
+        
+        Returns:
+            requests.Session: Pooled session
+        """
+        if self._session is None:
+            retry = Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(429, 502, 503, 504),
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            self._session = session
+        return self._session
     
     def get_access_token(self) -> str:
         """
@@ -45,9 +93,70 @@ class ShopifyAuth:
             if datetime.now() < self._token_expiry:
                 return self._access_token
         
+        # Reuse a token persisted by this or another process
+        if self._load_persisted_token():
+            return self._access_token
+        
         # Fetch new token via OAuth
         return self._fetch_oauth_token()
     
+    def _load_persisted_token(self) -> bool:
+        """
+        Load an unexpired OAuth token for this store from TOKEN_CACHE_PATH.
+        
+        Returns:
+            bool: True if a valid token was loaded
+        """
+        try:
+            with open(TOKEN_CACHE_PATH, 'r', encoding='utf-8') as f:
+                entry = json.load(f).get(self._config.store_domain)
+            if not entry:
+                return False
+            expiry = datetime.fromisoformat(entry['expiry'])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return False
+        
+        if datetime.now() >= expiry:
+            return False
+        
+        self._access_token = entry['token']
+        self._token_expiry = expiry
+        print('✅ Shopify access token loaded from cache')
+        return True
+    
+    def _persist_token(self) -> None:
+        """
+        Write the current OAuth token to TOKEN_CACHE_PATH.
+        The file is replaced atomically and, where fcntl is available,
+        writers hold an exclusive lock so concurrent workers don't drop
+        each other's entries.
+        """
+        cache_dir = os.path.dirname(TOKEN_CACHE_PATH) or '.'
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(TOKEN_CACHE_PATH + '.lock', 'w') as lock_file:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                
+                try:
+                    with open(TOKEN_CACHE_PATH, 'r', encoding='utf-8') as f:
+                        entries = json.load(f)
+                except (OSError, ValueError):
+                    entries = {}
+                
+                entries[self._config.store_domain] = {
+                    'token': self._access_token,
+                    'expiry': self._token_expiry.isoformat()
+                }
+                
+                # mkstemp creates the file with 0600 permissions
+                fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, TOKEN_CACHE_PATH)
+        except Exception as e:
+            print(f'⚠️ Could not persist Shopify access token: {e}')
+    
     def _fetch_oauth_token(self) -> str:
         """
         Fetch new access token using client credentials.
@@ -69,7 +178,7 @@ class ShopifyAuth:
                 'client_secret': self._config.client_secret
             }
             
-            response = requests.post(url, data=data)
+            response = self.session.post(url, data=data, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             
             result = response.json()
@@ -78,6 +187,7 @@ class ShopifyAuth:
             # Token expires in 24 hours, refresh 1 hour before
             expires_in = result.get('expires_in', 86400)
             self._token_expiry = datetime.now() + timedelta(seconds=expires_in - 3600)
+            self._persist_token()
             
             print('✅ Shopify access token obtained')
             return self._access_token
@@ -90,13 +200,25 @@ class ShopifyAuth:
         """
         Get headers for Shopify API requests.
         
+        The same dict is returned until the token changes, so callers
+        must not mutate it.
+        
         Returns:
             dict: Headers with authentication
         """
-        return {
+        headers = self._headers_cache
+        if headers is not None:
+            if self._config.access_token:
+                if headers['X-Shopify-Access-Token'] == self._config.access_token:
+                    return headers
+            elif self._token_expiry and datetime.now() < self._token_expiry:
+                return headers
+        
+        self._headers_cache = {
             'X-Shopify-Access-Token': self.get_access_token(),
             'Content-Type': 'application/json'
         }
+        return self._headers_cache
     
     def validate_connection(self) -> dict:
         """
@@ -107,7 +229,7 @@ class ShopifyAuth:
         """
         try:
             url = f"https://{self._config.store_domain}/admin/api/{self._config.api_version}/shop.json"
-            response = requests.get(url, headers=self.get_headers())
+            response = self.session.get(url, headers=self.get_headers(), timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             
             shop_data = response.json().get('shop', {})
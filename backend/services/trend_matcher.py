@@ -4,13 +4,19 @@ Compares products to current trends and identifies potential matches.
 Designed as a stateless service for LangGraph integration.
 """
 
+import atexit
 import json
-from typing import List, Dict, Any, Optional
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Callable
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import config
+from utils.helpers import strip_code_fence
 
 # Conditional import for Gemini
 try:
@@ -20,6 +26,206 @@ except ImportError:
     GEMINI_AVAILABLE = False
     print("⚠️ google-generativeai not installed. Using fallback matching.")
 
+# Conditional import for multi-pattern substring matching
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Conditional import for faster JSON encoding/decoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Only these fields are sent to Gemini in the match prompt
+_MATCH_PRODUCT_FIELDS = ('id', 'title', 'type', 'description', 'tags')
+_MATCH_TREND_FIELDS = ('id', 'name', 'target_products', 'keywords', 'color_palette', 'marketing_angle')
+
+# Word tokens used for the set-membership fast path in the matcher
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+def _compact(items: List[Dict[str, Any]], fields: tuple) -> List[Dict[str, Any]]:
+    """Keep only the given fields of each item."""
+    return [{k: item[k] for k in fields if k in item} for item in items]
+
+
+def _dumps_indented(obj: Any) -> str:
+    """Pretty-print JSON for prompts."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(obj, indent=2)
+
+
+class _CompiledTrends:
+    """
+    Lowercased trend patterns prepared once per matching run.
+    When pyahocorasick is installed every target, target word and keyword
+    is loaded into one automaton, so each product field is scanned once
+    regardless of how many trends there are.
+    """
+    
+    __slots__ = ('entries', '_automaton')
+    
+    def __init__(self, trends: List[Dict[str, Any]]):
+        self.entries = []
+        patterns = set()
+        
+        for trend in trends:
+            targets = []
+            for target in trend.get('target_products', []):
+                target_lower = target.lower()
+                words = [w for w in target_lower.split() if len(w) > 3]
+                targets.append((target, target_lower, words))
+                patterns.add(target_lower)
+                patterns.update(words)
+            
+            keywords = [(k, k.lower()) for k in trend.get('keywords', [])]
+            patterns.update(k for _, k in keywords)
+            
+            hashtags = {h.replace('#', '').lower() for h in trend.get('hashtags', [])}
+            self.entries.append((trend, targets, keywords, hashtags))
+        
+        self._automaton = None
+        patterns.discard('')
+        if AHOCORASICK_AVAILABLE and patterns:
+            automaton = ahocorasick.Automaton()
+            for pattern in patterns:
+                automaton.add_word(pattern, pattern)
+            automaton.make_automaton()
+            self._automaton = automaton
+    
+    def finder(self, text: str) -> Callable[[str], bool]:
+        """Return a predicate telling whether a pattern occurs in text."""
+        if self._automaton is None:
+            # A whole-word hit is found by hashing; anything else (partial
+            # words, multi-word phrases, misses) falls back to substring search
+            words = set(_WORD_RE.findall(text))
+            return lambda pattern: pattern in words or pattern in text
+        found = {pattern for _, pattern in self._automaton.iter(text)}
+        found.add('')
+        return found.__contains__
+
+
+def _match_product(product: Dict[str, Any], compiled: _CompiledTrends) -> List[Dict[str, Any]]:
+    """Match a single product against precompiled trends."""
+    
+    matched_trends = []
+    
+    product_type = product.get('type', '').lower()
+    product_title = product.get('title', '').lower()
+    product_desc = product.get('description', '').lower()
+    product_tags = [t.lower() for t in product.get('tags', [])]
+    product_tag_set = set(product_tags)
+    
+    all_product_text = f"{product_title} {product_type} {product_desc} {' '.join(product_tags)}"
+    
+    # Scan each field once; the trend loop below only does set lookups
+    in_title = compiled.finder(product_title)
+    in_type = compiled.finder(product_type)
+    in_text = compiled.finder(all_product_text)
+    
+    for trend, targets, keywords, hashtags in compiled.entries:
+        confidence = 0
+        reasons = []
+    
+        # Check target_products (highest weight)
+        for target, target_lower, target_words in targets:
+            # Check if target is in product title or type
+            if in_title(target_lower) or in_type(target_lower):
+                confidence += 50
+                reasons.append(f"'{target}' in target_products matches product")
+                break
+            # Also check partial matches (e.g., "trench" in "trench coat")
+            for word in target_words:
+                if in_title(word):
+                    confidence += 35
+                    reasons.append(f"'{word}' from target_products found in title")
+                    break
+    
+        # Confidence is capped at 100, so once there the remaining checks
+        # cannot change the result
+        if confidence < 100:
+            # Check keywords (medium weight)
+            keyword_matches = []
+            for keyword, keyword_lower in keywords:
+                if in_text(keyword_lower):
+                    keyword_matches.append(keyword)
+                    confidence += 5
+                    if confidence >= 100:
+                        break
+    
+            if keyword_matches:
+                reasons.append(f"keywords match: {', '.join(keyword_matches[:3])}")
+    
+        if confidence < 100:
+            # Check product tags against trend hashtags
+            tag_matches = product_tag_set & hashtags
+            if tag_matches:
+                confidence += 10
+                reasons.append(f"tag matches: {', '.join(tag_matches)}")
+    
+        # Only include if confidence meets threshold
+        if confidence >= 35:
+            matched_trends.append({
+                'trend_name': trend.get('name', ''),
+                'trend_id': trend.get('id', ''),
+                'confidence': min(confidence, 100),
+                'match_reasons': reasons
+            })
+    
+    # Sort by confidence
+    matched_trends.sort(key=lambda x: x['confidence'], reverse=True)
+    
+    return matched_trends
+
+
+# Products above which opt-in parallel matching is sharded across processes.
+# Serial matching handles 10,000 products in well under a second, so below
+# this the pool's IPC overhead outweighs any speedup.
+_PARALLEL_MATCH_THRESHOLD = 20000
+
+# Shared matching pool, created on first parallel run
+_match_pool: Optional[ProcessPoolExecutor] = None
+_match_pool_lock = threading.Lock()
+
+
+def _get_match_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared matching pool, creating it on first use.
+    Workers are spawned rather than forked so a multithreaded server
+    never forks while another thread holds a lock.
+    """
+    global _match_pool
+    with _match_pool_lock:
+        if _match_pool is None:
+            _match_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+            atexit.register(_match_pool.shutdown)
+        return _match_pool
+
+
+def _reset_match_pool() -> None:
+    """Drop a broken pool so the next parallel run starts a fresh one."""
+    global _match_pool
+    with _match_pool_lock:
+        if _match_pool is not None:
+            _match_pool.shutdown(wait=False, cancel_futures=True)
+            _match_pool = None
+
+
+def _match_chunk(
+    products: List[Dict[str, Any]],
+    trends: List[Dict[str, Any]]
+) -> List[List[Dict[str, Any]]]:
+    """Picklable pool task: compile trends once and match a slice of products."""
+    compiled = _CompiledTrends(trends)
+    return [_match_product(product, compiled) for product in products]
+
 
 class TrendMatcher:
     """
@@ -27,6 +233,8 @@ class TrendMatcher:
     Returns structured match data without generating new content.
     """
     
+    __slots__ = ('_config', '_model')
+    
     def __init__(self):
         self._config = config.ai
         self._model = None
@@ -63,7 +271,8 @@ class TrendMatcher:
     def find_matches(
         self, 
         products: List[Dict[str, Any]], 
-        trends: List[Dict[str, Any]]
+        trends: List[Dict[str, Any]],
+        parallel: bool = False
     ) -> Dict[str, Any]:
         """
         Find which products match which trends.
@@ -71,6 +280,8 @@ class TrendMatcher:
         Args:
             products: List of product summaries with id, title, type, description, tags
             trends: List of trends with name, keywords, target_products, etc.
+            parallel: Let rule-based matching of very large catalogs use the
+                shared process pool. Leave off for request-time callers.
             
         Returns:
             {
@@ -95,14 +306,15 @@ class TrendMatcher:
             }
         """
         if self._model:
-            return self._ai_match(products, trends)
+            return self._ai_match(products, trends, parallel)
         else:
-            return self._rule_based_match(products, trends)
+            return self._rule_based_match(products, trends, parallel)
     
     def _ai_match(
         self, 
         products: List[Dict[str, Any]], 
-        trends: List[Dict[str, Any]]
+        trends: List[Dict[str, Any]],
+        parallel: bool = False
     ) -> Dict[str, Any]:
         """Use Gemini to find product-trend matches."""
         
@@ -112,7 +324,7 @@ class TrendMatcher:
             response_text = self._call_genai(prompt)
             response_text = self._clean_response(response_text)
 
-            result = json.loads(response_text)
+            result = _json_loads(response_text)
             result['method'] = 'gemini'
             result['success'] = True
             
@@ -120,10 +332,10 @@ class TrendMatcher:
             
         except json.JSONDecodeError as e:
             print(f'❌ Error parsing Gemini response: {e}')
-            return self._rule_based_match(products, trends)
+            return self._rule_based_match(products, trends, parallel)
         except Exception as e:
             print(f'❌ Error in AI matching: {e}')
-            return self._rule_based_match(products, trends)
+            return self._rule_based_match(products, trends, parallel)
 
     def _call_genai(self, prompt: str) -> str:
         if not self._model:
@@ -192,8 +404,8 @@ class TrendMatcher:
     ) -> str:
         """Build the prompt for trend matching."""
         
-        products_json = json.dumps(products, indent=2)
-        trends_json = json.dumps(trends, indent=2)
+        products_json = _dumps_indented(_compact(products, _MATCH_PRODUCT_FIELDS))
+        trends_json = _dumps_indented(_compact(trends, _MATCH_TREND_FIELDS))
         
         return f"""You are a fashion trend analyst. Your task is to match products to current trends.
 
@@ -263,30 +475,41 @@ Return ONLY valid JSON, no other text."""
     
     def _clean_response(self, response_text: str) -> str:
         """Clean Gemini response by removing markdown code blocks."""
-        text = response_text.strip()
-        
-        if text.startswith('```json'):
-            text = text[7:]
-        if text.startswith('```'):
-            text = text[3:]
-        if text.endswith('```'):
-            text = text[:-3]
-        
-        return text.strip()
+        return strip_code_fence(response_text)
     
     def _rule_based_match(
         self, 
         products: List[Dict[str, Any]], 
-        trends: List[Dict[str, Any]]
+        trends: List[Dict[str, Any]],
+        parallel: bool = False
     ) -> Dict[str, Any]:
         """Fallback rule-based matching when AI is unavailable."""
         
         matches = []
         unmatched = []
         
-        for product in products:
-            product_matches = self._match_product_to_trends(product, trends)
-            
+        per_product = None
+        workers = os.cpu_count() or 1
+        if parallel and workers > 1 and len(products) > _PARALLEL_MATCH_THRESHOLD:
+            # Pure CPU work: one slice per worker, compiling trends once per slice
+            try:
+                size = -(-len(products) // workers)
+                slices = [products[i:i + size] for i in range(0, len(products), size)]
+                pool = _get_match_pool()
+                per_product = [
+                    result
+                    for chunk in pool.map(_match_chunk, slices, [trends] * len(slices))
+                    for result in chunk
+                ]
+            except Exception as e:
+                _reset_match_pool()
+                print(f'⚠️ Parallel matching unavailable, matching serially: {e}')
+        
+        if per_product is None:
+            compiled = _CompiledTrends(trends)
+            per_product = [_match_product(product, compiled) for product in products]
+        
+        for product, product_matches in zip(products, per_product):
             if product_matches:
                 matches.append({
                     'product_id': product['id'],
@@ -311,71 +534,14 @@ Return ONLY valid JSON, no other text."""
     def _match_product_to_trends(
         self, 
         product: Dict[str, Any], 
-        trends: List[Dict[str, Any]]
+        trends: List[Dict[str, Any]],
+        compiled: Optional[_CompiledTrends] = None
     ) -> List[Dict[str, Any]]:
         """Match a single product against all trends."""
         
-        matched_trends = []
-        
-        product_type = product.get('type', '').lower()
-        product_title = product.get('title', '').lower()
-        product_desc = product.get('description', '').lower()
-        product_tags = [t.lower() for t in product.get('tags', [])]
-        
-        all_product_text = f"{product_title} {product_type} {product_desc} {' '.join(product_tags)}"
-        
-        for trend in trends:
-            confidence = 0
-            reasons = []
-            
-            # Check target_products (highest weight)
-            target_products = trend.get('target_products', [])
-            for target in target_products:
-                target_lower = target.lower()
-                # Check if target is in product title or type
-                if target_lower in product_title or target_lower in product_type:
-                    confidence += 50
-                    reasons.append(f"'{target}' in target_products matches product")
-                    break
-                # Also check partial matches (e.g., "trench" in "trench coat")
-                target_words = target_lower.split()
-                for word in target_words:
-                    if len(word) > 3 and word in product_title:
-                        confidence += 35
-                        reasons.append(f"'{word}' from target_products found in title")
-                        break
-            
-            # Check keywords (medium weight)
-            keywords = trend.get('keywords', [])
-            keyword_matches = []
-            for keyword in keywords:
-                if keyword.lower() in all_product_text:
-                    keyword_matches.append(keyword)
-                    confidence += 5
-            
-            if keyword_matches:
-                reasons.append(f"keywords match: {', '.join(keyword_matches[:3])}")
-            
-            # Check product tags against trend hashtags
-            hashtags = [h.replace('#', '').lower() for h in trend.get('hashtags', [])]
-            tag_matches = set(product_tags) & set(hashtags)
-            if tag_matches:
-                confidence += 10
-                reasons.append(f"tag matches: {', '.join(tag_matches)}")
-            
-            # Only include if confidence meets threshold
-            if confidence >= 35:
-                matched_trends.append({
-                    'trend_name': trend.get('name', ''),
-                    'trend_id': trend.get('id', ''),
-                    'confidence': min(confidence, 100),
-                    'match_reasons': reasons
-                })
-        
-        # Sort by confidence
-        matched_trends.sort(key=lambda x: x['confidence'], reverse=True)
-        
-        return matched_trends
+        if compiled is None:
+            compiled = _CompiledTrends(trends)
+        return _match_product(product, compiled)
 
 
 # Note: Do not instantiate at import time to avoid calling external
@@ -4,11 +4,99 @@ Loads and manages trend data from various sources.
 Designed as a stateless service for LangGraph integration.
 """
 
+import heapq
 import json
 import os
-from typing import List, Dict, Any, Optional
+from collections import defaultdict
+from functools import lru_cache
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
 from datetime import datetime
 
+# Conditional import for faster JSON encoding/decoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Conditional import for streaming JSON parsing
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Trend files larger than this are streamed for single lookups
+# instead of being parsed in full
+_STREAM_THRESHOLD_BYTES = 1024 * 1024
+
+
+@lru_cache(maxsize=4)
+def _load_trends(path: str, mtime: float) -> Tuple[Dict[str, Any], ...]:
+    """
+    Parse a trends file. Cached per (path, mtime) so the file is only
+    re-read when it changes on disk.
+    """
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    
+    trends = tuple(data.get('trends', []))
+    print(f'✅ Loaded {len(trends)} trends')
+    return trends
+
+
+def _iter_trends(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream trend objects from a trends file one at a time."""
+    with open(path, 'rb') as f:
+        yield from ijson.items(f, 'trends.item', use_float=True)
+
+
+@lru_cache(maxsize=4)
+def _sorted_by_popularity(path: str, mtime: float) -> Tuple[Dict[str, Any], ...]:
+    """Trends from a file version sorted by popularity score, highest first."""
+    return tuple(sorted(
+        _load_trends(path, mtime),
+        key=lambda t: t.get('popularity_score', 0),
+        reverse=True
+    ))
+
+
+@lru_cache(maxsize=4)
+def _trend_indexes(path: str, mtime: float) -> Tuple[Dict[str, Tuple[Dict[str, Any], ...]], Dict[str, Dict[str, Any]]]:
+    """
+    Platform -> trends and id -> trend lookups for a file version.
+    The first trend wins when IDs repeat, matching a linear scan.
+    """
+    by_platform = defaultdict(list)
+    by_id = {}
+    for trend in _load_trends(path, mtime):
+        for platform in dict.fromkeys(trend.get('platforms', [])):
+            by_platform[platform].append(trend)
+        by_id.setdefault(trend.get('id'), trend)
+    return {k: tuple(v) for k, v in by_platform.items()}, by_id
+
+
+def _lowercase_fields(trend: Dict[str, Any]) -> Tuple[List[str], List[str], Set[str]]:
+    """Lowercased target_products, keywords and '#'-stripped hashtags of a trend."""
+    return (
+        [t.lower() for t in trend.get('target_products', [])],
+        [k.lower() for k in trend.get('keywords', [])],
+        {h.replace('#', '').lower() for h in trend.get('hashtags', [])}
+    )
+
+
+@lru_cache(maxsize=4)
+def _lowercase_index(path: str, mtime: float) -> Dict[int, Tuple[Dict[str, Any], Tuple]]:
+    """
+    Lowercased fields for every trend in a file version, keyed by id(trend).
+    The trend itself is stored alongside so lookups can verify identity.
+    """
+    return {id(t): (t, _lowercase_fields(t)) for t in _load_trends(path, mtime)}
+
 
 class TrendsService:
     """
@@ -16,11 +104,21 @@ class TrendsService:
     Currently loads from JSON, can be extended to fetch from APIs.
     """
     
+    __slots__ = ('_data_dir', '_lowercase', '_loaded_version')
+    
     def __init__(self):
         self._data_dir = os.path.join(
             os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
             'data'
         )
+        # Lowercased trend fields for the most recently loaded file version
+        self._lowercase: Dict[int, Tuple[Dict[str, Any], Tuple]] = {}
+        # (path, mtime) of the file version currently held in the parse cache
+        self._loaded_version: Optional[Tuple[str, float]] = None
+    
+    def _trends_file(self) -> str:
+        """Path to the bundled trends JSON file."""
+        return os.path.join(self._data_dir, 'sample_trends.json')
     
     def get_current_trends(self) -> List[Dict[str, Any]]:
         """
@@ -30,13 +128,12 @@ class TrendsService:
             List of trend dictionaries
         """
         try:
-            trends_file = os.path.join(self._data_dir, 'sample_trends.json')
-            with open(trends_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            trends = data.get('trends', [])
-            print(f'✅ Loaded {len(trends)} trends')
-            return trends
+            trends_file = self._trends_file()
+            mtime = os.stat(trends_file).st_mtime
+            trends = _load_trends(trends_file, mtime)
+            self._lowercase = _lowercase_index(trends_file, mtime)
+            self._loaded_version = (trends_file, mtime)
+            return list(trends)
             
         except FileNotFoundError:
             print('⚠️ sample_trends.json not found, returning empty trends')
@@ -45,49 +142,119 @@ class TrendsService:
             print(f'❌ Error loading trends: {e}')
             return []
     
-    def get_trend_by_id(self, trend_id: str) -> Optional[Dict[str, Any]]:
+    def _get_indexes(self) -> Tuple[Dict[str, Tuple[Dict[str, Any], ...]], Dict[str, Dict[str, Any]]]:
+        """Platform and ID indexes for the current trends file version."""
+        try:
+            trends_file = self._trends_file()
+            mtime = os.stat(trends_file).st_mtime
+            indexes = _trend_indexes(trends_file, mtime)
+            self._loaded_version = (trends_file, mtime)
+            return indexes
+        except FileNotFoundError:
+            print('⚠️ sample_trends.json not found, returning empty trends')
+        except Exception as e:
+            print(f'❌ Error loading trends: {e}')
+        return {}, {}
+    
+    def get_lowercase_fields(self, trend: Dict[str, Any]) -> Tuple[List[str], List[str], Set[str]]:
+        """
+        Get lowercased matching fields for a trend.
+        Trends returned by get_current_trends are normalized once per file load;
+        any other trend dict is lowercased on the fly.
+        
+        Args:
+            trend: Trend dictionary
+            
+        Returns:
+            (target_products, keywords, hashtags) in lowercase
+        """
+        entry = self._lowercase.get(id(trend))
+        if entry is not None and entry[0] is trend:
+            return entry[1]
+        return _lowercase_fields(trend)
+    
+    def get_trend_by_id(
+        self,
+        trend_id: str,
+        trends: Optional[List[Dict[str, Any]]] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Get a specific trend by its ID.
         
         Args:
             trend_id: The trend identifier
+            trends: Optional preloaded trends to search instead of the trends file
             
         Returns:
             Trend dictionary or None if not found
         """
-        trends = self.get_current_trends()
-        return next((t for t in trends if t['id'] == trend_id), None)
+        if trends is not None:
+            return next((t for t in trends if t.get('id') == trend_id), None)
+        
+        if IJSON_AVAILABLE:
+            try:
+                trends_file = self._trends_file()
+                stat = os.stat(trends_file)
+                # Large file that is not parsed yet: stream and stop at the match
+                if (stat.st_size > _STREAM_THRESHOLD_BYTES
+                        and self._loaded_version != (trends_file, stat.st_mtime)):
+                    return next((t for t in _iter_trends(trends_file) if t.get('id') == trend_id), None)
+            except Exception as e:
+                print(f'⚠️ Streaming trend lookup failed, loading full file: {e}')
+        
+        _, by_id = self._get_indexes()
+        return by_id.get(trend_id)
     
-    def get_trends_by_platform(self, platform: str) -> List[Dict[str, Any]]:
+    def get_trends_by_platform(
+        self,
+        platform: str,
+        trends: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Filter trends by social platform.
         
         Args:
             platform: Platform name (TikTok, Instagram, Pinterest, etc.)
+            trends: Optional preloaded trends to filter instead of the trends file
             
         Returns:
             List of trends active on that platform
         """
-        trends = self.get_current_trends()
-        return [t for t in trends if platform in t.get('platforms', [])]
+        if trends is not None:
+            return [t for t in trends if platform in t.get('platforms', [])]
+        
+        by_platform, _ = self._get_indexes()
+        return list(by_platform.get(platform, ()))
     
-    def get_top_trends(self, limit: int = 5) -> List[Dict[str, Any]]:
+    def get_top_trends(
+        self,
+        limit: int = 5,
+        trends: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get top trends sorted by popularity score.
         
         Args:
             limit: Number of trends to return
+            trends: Optional preloaded trends to rank instead of the trends file
             
         Returns:
             List of top trends
         """
-        trends = self.get_current_trends()
-        sorted_trends = sorted(
-            trends, 
-            key=lambda t: t.get('popularity_score', 0), 
-            reverse=True
-        )
-        return sorted_trends[:limit]
+        if trends is not None:
+            return heapq.nlargest(limit, trends, key=lambda t: t.get('popularity_score', 0))
+        
+        try:
+            trends_file = self._trends_file()
+            sorted_trends = _sorted_by_popularity(trends_file, os.stat(trends_file).st_mtime)
+        except Exception:
+            # Fall back to the uncached path for its error handling and logging
+            sorted_trends = sorted(
+                self.get_current_trends(),
+                key=lambda t: t.get('popularity_score', 0),
+                reverse=True
+            )
+        return list(sorted_trends[:limit])
     
     def get_trend_summary(self, trend: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -128,9 +295,10 @@ class TrendsService:
         product_title = product.get('title', '').lower()
         product_tags = [t.lower() for t in product.get('tags', [])]
         
+        target_products, keywords, _ = self.get_lowercase_fields(trend)
+        
         # Check target products
-        for target in trend.get('target_products', []):
-            target_lower = target.lower()
+        for target_lower in target_products:
             if target_lower in product_type or target_lower in product_title:
                 score += 30
             for tag in product_tags:
@@ -139,8 +307,8 @@ class TrendsService:
         
         # Check keywords
         all_product_text = f"{product_title} {product_type} {' '.join(product_tags)}".lower()
-        for keyword in trend.get('keywords', []):
-            if keyword.lower() in all_product_text:
+        for keyword_lower in keywords:
+            if keyword_lower in all_product_text:
                 score += 5
         
         return min(score, 100)
@@ -5,7 +5,10 @@ Designed as a stateless service for LangGraph integration.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any, Optional
 import sys
 import os
@@ -24,14 +27,15 @@ class VideoAnalyzer:
         self._config = config.ai
         self._base_url = self._config.twelve_labs_base_url
         self._api_key = self._config.twelve_labs_api_key
-    
-    @property
-    def _headers(self) -> Dict[str, str]:
-        """Get API headers."""
-        return {
-            'x-api-key': self._api_key,
+        
+        # Keep-alive session so index, upload, status polls and searches
+        # reuse the same HTTPS connection to Twelve Labs
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+        self._session.headers.update({
+            'x-api-key': self._api_key or '',
             'Content-Type': 'application/json'
-        }
+        })
     
     def is_available(self) -> bool:
         """Check if Twelve Labs API is configured."""
@@ -61,7 +65,7 @@ class VideoAnalyzer:
                 }]
             }
             
-            response = requests.post(url, json=data, headers=self._headers)
+            response = self._session.post(url, json=data)
             response.raise_for_status()
             
             result = response.json()
@@ -94,7 +98,7 @@ class VideoAnalyzer:
                 "url": video_url
             }
             
-            response = requests.post(url, json=data, headers=self._headers)
+            response = self._session.post(url, json=data)
             response.raise_for_status()
             
             result = response.json()
@@ -110,15 +114,23 @@ class VideoAnalyzer:
         self, 
         task_id: str, 
         max_wait: int = 600,
-        poll_interval: int = 10
+        poll_interval: int = 10,
+        max_delay: int = 60
     ) -> bool:
         """
         Wait for video processing to complete.
         
+        Polls back off exponentially with full jitter (a random sleep up to
+        poll_interval * 2**attempt, capped at max_delay), so long tasks are
+        polled less often. Transient HTTP errors are retried until max_wait.
+        Polls send If-None-Match when the API returned an ETag, so an
+        unchanged task costs a bodiless 304.
+        
         Args:
             task_id: The task to monitor
             max_wait: Maximum seconds to wait
-            poll_interval: Seconds between status checks
+            poll_interval: Base delay in seconds between status checks
+            max_delay: Upper bound for a single delay
             
         Returns:
             True if processing completed successfully
@@ -127,30 +139,44 @@ class VideoAnalyzer:
             return False
         
         url = f"{self._base_url}/tasks/{task_id}"
-        elapsed = 0
+        deadline = time.monotonic() + max_wait
+        attempt = 0
+        # Conditional GET: an unchanged task answers 304 with no body to decode
+        etag = None
+        status = None
         
-        while elapsed < max_wait:
+        while time.monotonic() < deadline:
             try:
-                response = requests.get(url, headers=self._headers)
-                response.raise_for_status()
-                
-                result = response.json()
-                status = result.get('status')
-                
-                if status == 'ready':
-                    print(f'✅ Video processing complete')
-                    return True
-                elif status == 'failed':
-                    print(f'❌ Video processing failed')
-                    return False
+                headers = {'If-None-Match': etag} if etag else None
+                response = self._session.get(url, headers=headers)
                 
-                print(f'⏳ Processing... ({status})')
-                time.sleep(poll_interval)
-                elapsed += poll_interval
+                if response.status_code == 304:
+                    print(f'⏳ Processing... ({status}, unchanged)')
+                else:
+                    response.raise_for_status()
+                    etag = response.headers.get('ETag')
+                    
+                    result = response.json()
+                    status = result.get('status')
+                    
+                    if status == 'ready':
+                        print(f'✅ Video processing complete')
+                        return True
+                    elif status == 'failed':
+                        print(f'❌ Video processing failed')
+                        return False
+                    
+                    print(f'⏳ Processing... ({status})')
                 
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f'⚠️ Error checking status, retrying: {e}')
             except Exception as e:
                 print(f'❌ Error checking status: {e}')
                 return False
+            
+            delay = min(max_delay, poll_interval * 2 ** attempt)
+            attempt += 1
+            time.sleep(min(random.uniform(0, delay), max(0.0, deadline - time.monotonic())))
         
         print(f'⚠️ Timeout waiting for processing')
         return False
@@ -184,7 +210,7 @@ class VideoAnalyzer:
                 "filter": {"id": [video_id]}
             }
             
-            response = requests.post(url, json=data, headers=self._headers)
+            response = self._session.post(url, json=data)
             response.raise_for_status()
             
             result = response.json()
@@ -199,6 +225,26 @@ class VideoAnalyzer:
             print(f'❌ Error analyzing video: {e}')
             return {'success': False, 'error': str(e)}
     
+    def _search_terms_parallel(
+        self,
+        index_id: str,
+        video_id: str,
+        search_terms: List[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Run one search per term concurrently and group matches by term."""
+        # Searches are independent network calls, so run them concurrently
+        # over the pooled session
+        grouped = {}
+        with ThreadPoolExecutor(max_workers=len(search_terms)) as executor:
+            futures = {
+                executor.submit(self.analyze_video_content, index_id, video_id, term): term
+                for term in search_terms
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                grouped[futures[future]] = result.get('matches', []) if result.get('success') else []
+        return grouped
+    
     def extract_video_themes(self, video_id: str, index_id: str) -> List[str]:
         """
         Extract main themes/topics from a video.
@@ -220,20 +266,21 @@ class VideoAnalyzer:
             "trend popular viral"
         ]
         
+        matches_by_term = self._search_terms_parallel(index_id, video_id, search_terms)
+        
         for term in search_terms:
-            result = self.analyze_video_content(index_id, video_id, term)
-            if result.get('success') and result.get('matches'):
-                for match in result['matches']:
-                    confidence = match.get('confidence', 0)
-                    if confidence > 0.5:
-                        themes.append({
-                            'term': term,
-                            'confidence': confidence,
-                            'timestamp': match.get('start', 0)
-                        })
+            for match in matches_by_term.get(term, []):
+                confidence = match.get('confidence', 0)
+                if confidence > 0.5:
+                    themes.append({
+                        'term': term,
+                        'confidence': confidence,
+                        'timestamp': match.get('start', 0)
+                    })
         
         return themes
 
 
-# Global singleton instance
-video_analyzer = VideoAnalyzer()
+# Note: Do not instantiate at import time so importing this module does not
+# build the Twelve Labs session. Use services.get_video_analyzer() to obtain a
+# lazily-initialized singleton.
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Shared async HTTP client for the backend smoke-test scripts.
+
+Every script drives its calls through one httpx.AsyncClient, so all
+requests in a run share a connection pool. HTTP/2 is negotiated when the
+optional `h2` package is installed, letting concurrent requests multiplex
+over a single connection.
+"""
+from typing import Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+DEFAULT_TIMEOUT = 10.0
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+async def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            headers=JSON_HEADERS,
+            limits=httpx.Limits(max_keepalive_connections=8),
+            timeout=DEFAULT_TIMEOUT,
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client (call once at the end of a script)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,14 +1,13 @@
 import os
 import json
-import urllib.request
-import urllib.error
+import asyncio
 import urllib.parse
 
+from test_common import get_client, close_client
+
 BASE = os.environ.get('BASE_URL', 'http://127.0.0.1:5000')
 TIMEOUT = 10
 
-headers = {'Content-Type': 'application/json'}
-
 endpoints = [
     ('GET', '/health'),
     ('GET', '/health/config'),
@@ -21,74 +20,94 @@ endpoints = [
     ('POST', '/admin/graphql'),
 ]
 
+SEPARATOR = '\n' + '-' * 60 + '\n'
+
+
+# Listings whose parsed bodies drive the follow-up detail calls
+PARSED_PATHS = {'/api/products', '/api/trends'}
+
+SNIPPET_BYTES = 4096
 
-def call(method, path, body=None):
+
+async def call(client, method, path, body=None, parse=False):
     url = BASE.rstrip('/') + path
-    data = None
-    req_headers = headers.copy()
-    if body is not None:
-        data = json.dumps(body).encode('utf-8')
-    req = urllib.request.Request(url, data=data, headers=req_headers, method=method)
+    # Build each report as one block so concurrent calls don't interleave output
+    lines = []
     try:
-        with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
-            text = resp.read().decode('utf-8', errors='replace')
-            print(f"{method} {path} -> {resp.status} {resp.reason}")
-            snippet = text[:1000]
-            print(snippet)
+        async with client.stream(method, url, json=body, timeout=TIMEOUT) as resp:
+            # Only the head of the body is printed; read the rest only when it is parsed
+            raw = b''
+            async for chunk in resp.aiter_bytes():
+                raw += chunk
+                if not parse and len(raw) >= SNIPPET_BYTES:
+                    break
+            snippet = raw[:SNIPPET_BYTES].decode('utf-8', errors='replace')[:1000]
+            if resp.status_code >= 400:
+                lines.append(f"{method} {path} -> HTTPError {resp.status_code}")
+                lines.append(snippet)
+                return None
+            lines.append(f"{method} {path} -> {resp.status_code} {resp.reason_phrase}")
+            lines.append(snippet)
+            if not parse:
+                return None
             try:
-                parsed = json.loads(text)
-                return parsed
+                return json.loads(raw)
             except Exception:
-                return text
-    except urllib.error.HTTPError as e:
-        print(f"{method} {path} -> HTTPError {e.code}")
-        try:
-            err = e.read().decode('utf-8', errors='replace')
-            print(err[:1000])
-        except Exception:
-            pass
+                return raw.decode('utf-8', errors='replace')
     except Exception as e:
-        print(f"{method} {path} -> Exception: {e}")
+        lines.append(f"{method} {path} -> Exception: {e!r}")
+    finally:
+        print('\n'.join(lines) + '\n' + SEPARATOR)
 
 
-if __name__ == '__main__':
+async def main():
     print('Base URL:', BASE)
-    results = {}
-
-    # Run initial endpoints
-    for method, path in endpoints:
-        body = None
-        if path == '/admin/graphql':
-            body = {"query": "{ shop { name myshopifyDomain } }"}
-        if method == 'POST' and body is None:
-            body = {}
-        results[path] = call(method, path, body)
-        print('\n' + '-' * 60 + '\n')
-
-    # If products returned, pick first product id for product-specific tests
-    products = results.get('/api/products')
-    product_id = None
-    if isinstance(products, dict) and products.get('products'):
-        p0 = products['products'][0]
-        product_id = p0.get('id') or p0.get('gid') or p0.get('handle') or p0.get('id')
-
-    if product_id:
-        print('Using product id:', product_id)
-        # ensure proper path encoding
-        pid = urllib.parse.quote(product_id, safe='')
-        call('POST', f'/api/products/{pid}/analyze', {})
-        print('\n' + '-' * 60 + '\n')
-        call('POST', f'/api/products/{pid}/apply', {'dry_run': True})
-        print('\n' + '-' * 60 + '\n')
-        call('POST', f'/api/products/{pid}/generate-marketing', {'trend_id': ''})
-        print('\n' + '-' * 60 + '\n')
-
-    # Trends detail if available
-    trends = results.get('/api/trends')
-    if isinstance(trends, dict) and trends.get('trends'):
-        t0 = trends['trends'][0]
-        trend_id = t0.get('id')
-        if trend_id:
-            call('GET', f'/api/trends/{trend_id}')
+
+    client = await get_client()
+    try:
+        # Run initial endpoints concurrently
+        calls = []
+        for method, path in endpoints:
+            body = None
+            if path == '/admin/graphql':
+                body = {"query": "{ shop { name myshopifyDomain } }"}
+            if method == 'POST' and body is None:
+                body = {}
+            calls.append(call(client, method, path, body, parse=path in PARSED_PATHS))
+        responses = await asyncio.gather(*calls)
+        results = {path: resp for (_, path), resp in zip(endpoints, responses)}
+
+        # Detail calls depend on the listings above
+        followups = []
+
+        # If products returned, pick first product id for product-specific tests
+        products = results.get('/api/products')
+        product_id = None
+        if isinstance(products, dict) and products.get('products'):
+            p0 = products['products'][0]
+            product_id = p0.get('id') or p0.get('gid') or p0.get('handle')
+
+        if product_id:
+            print('Using product id:', product_id)
+            # ensure proper path encoding
+            pid = urllib.parse.quote(product_id, safe='')
+            followups.append(call(client, 'POST', f'/api/products/{pid}/analyze', {}))
+            followups.append(call(client, 'POST', f'/api/products/{pid}/apply', {'dry_run': True}))
+            followups.append(call(client, 'POST', f'/api/products/{pid}/generate-marketing', {'trend_id': ''}))
+
+        # Trends detail if available
+        trends = results.get('/api/trends')
+        if isinstance(trends, dict) and trends.get('trends'):
+            trend_id = trends['trends'][0].get('id')
+            if trend_id:
+                followups.append(call(client, 'GET', f'/api/trends/{trend_id}'))
+
+        await asyncio.gather(*followups)
+    finally:
+        await close_client()
 
     print('\nDone.')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
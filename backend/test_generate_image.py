@@ -12,10 +12,12 @@ the HTTP status and response body for debugging.
 import os
 import sys
 import json
-import requests
+import asyncio
 
+from test_common import get_client, close_client
 
-def main():
+
+async def main():
     server = os.environ.get('TEST_SERVER', 'http://127.0.0.1:5000')
     product_id = None
     if len(sys.argv) > 1:
@@ -28,18 +30,20 @@ def main():
         sys.exit(2)
 
     url = f"{server.rstrip('/')}/api/products/{product_id}/apply"
-    headers = {'Content-Type': 'application/json'}
     payload = {
         'trigger': 'smoke-test',
         'dry_run': True
     }
 
     print('POST', url)
+    client = await get_client()
     try:
-        r = requests.post(url, headers=headers, json=payload, timeout=120)
+        r = await client.post(url, json=payload, timeout=120)
     except Exception as e:
         print('Request failed:', e)
         sys.exit(3)
+    finally:
+        await close_client()
 
     print('HTTP', r.status_code)
     ct = r.headers.get('Content-Type', '')
@@ -51,4 +55,4 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    asyncio.run(main())
@@ -10,22 +10,26 @@ Usage:
 import os
 import json
 import sys
-import requests
+import asyncio
 
+from test_common import get_client, close_client
 
-def main():
+
+async def main():
     endpoint = os.environ.get('TEST_GRAPHQL_ENDPOINT', 'http://127.0.0.1:5000/admin/graphql')
     query = os.environ.get('TEST_GRAPHQL_QUERY', '{ shop { name myshopifyDomain } }')
 
     payload = {'query': query}
-    headers = {'Content-Type': 'application/json'}
 
     print(f'POST {endpoint}')
+    client = await get_client()
     try:
-        r = requests.post(endpoint, headers=headers, json=payload, timeout=30)
+        r = await client.post(endpoint, json=payload, timeout=30)
     except Exception as e:
         print('Request failed:', e)
         sys.exit(2)
+    finally:
+        await close_client()
 
     print('HTTP', r.status_code)
     ct = r.headers.get('Content-Type', '')
@@ -39,4 +43,4 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    asyncio.run(main())
@@ -7,7 +7,8 @@ from .helpers import (
     truncate_text,
     format_price,
     slugify,
-    merge_dicts
+    merge_dicts,
+    strip_code_fence
 )
 
 __all__ = [
@@ -15,5 +16,6 @@ __all__ = [
     'truncate_text', 
     'format_price',
     'slugify',
-    'merge_dicts'
+    'merge_dicts',
+    'strip_code_fence'
 ]
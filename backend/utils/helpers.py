@@ -1,14 +1,37 @@
 """
 Helper utility functions.
 
-Note: These functions are currently not actively used in the codebase,
-but are kept for potential future use.
+Note: Apart from strip_code_fence, these functions are currently not
+actively used in the codebase, but are kept for potential future use.
 """
 
 import re
 from typing import Dict, Any
 import html
 
+# Patterns are compiled once at import; these helpers run per product description
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+_NON_SLUG_RE = re.compile(r'[^a-z0-9-]')
+_DASH_RE = re.compile(r'-+')
+# Leading ```json / ``` fence and trailing ``` fence around a Gemini response
+_CODE_FENCE_RE = re.compile(r'\A\s*```(?:json)?\s*|\s*```\s*\Z', re.IGNORECASE)
+
+_CURRENCY_SYMBOLS = {
+    'USD': '$',
+    'EUR': '€',
+    'GBP': '£',
+    'CAD': 'C$',
+    'AUD': 'A$'
+}
+
+# ASCII translation for slugify: whitespace -> '-', anything outside [a-z0-9-] dropped
+_SLUG_KEEP = frozenset('abcdefghijklmnopqrstuvwxyz0123456789-')
+_SLUG_TABLE = {
+    i: ('-' if chr(i).isspace() else None)
+    for i in range(128)
+    if chr(i) not in _SLUG_KEEP
+}
 
 def clean_html(text: str) -> str:
     """
@@ -23,12 +46,16 @@ def clean_html(text: str) -> str:
     if not text:
         return ""
     
+    # Plain text (no tags or entities) only needs whitespace normalization
+    if '<' not in text and '&' not in text:
+        return _WS_RE.sub(' ', text).strip()
+    
     # Remove HTML tags
-    clean = re.sub(r'<[^>]+>', '', text)
+    clean = _HTML_TAG_RE.sub('', text)
     # Decode HTML entities
     clean = html.unescape(clean)
     # Normalize whitespace
-    clean = ' '.join(clean.split())
+    clean = _WS_RE.sub(' ', clean).strip()
     
     return clean
 
@@ -48,14 +75,12 @@ def truncate_text(text: str, max_length: int = 150, suffix: str = "...") -> str:
     if not text or len(text) <= max_length:
         return text or ""
     
-    # Find last space before max_length
+    # Cut at the last space before max_length, else hard-cut
     truncate_at = max_length - len(suffix)
     last_space = text.rfind(' ', 0, truncate_at)
+    end = last_space if last_space > 0 else truncate_at
     
-    if last_space > 0:
-        return text[:last_space] + suffix
-    else:
-        return text[:truncate_at] + suffix
+    return f"{text[:end]}{suffix}"
 
 
 def format_price(price: float, currency: str = "USD") -> str:
@@ -69,16 +94,7 @@ def format_price(price: float, currency: str = "USD") -> str:
     Returns:
         Formatted price string
     """
-    currency_symbols = {
-        'USD': '$',
-        'EUR': '€',
-        'GBP': '£',
-        'CAD': 'C$',
-        'AUD': 'A$'
-    }
-    
-    symbol = currency_symbols.get(currency, '$')
-    return f"{symbol}{price:.2f}"
+    return f"{_CURRENCY_SYMBOLS.get(currency, '$')}{price:.2f}"
 
 
 def slugify(text: str) -> str:
@@ -94,14 +110,17 @@ def slugify(text: str) -> str:
     if not text:
         return ""
     
-    # Lowercase
     slug = text.lower()
-    # Replace spaces with hyphens
-    slug = re.sub(r'\s+', '-', slug)
-    # Remove non-alphanumeric characters (except hyphens)
-    slug = re.sub(r'[^a-z0-9-]', '', slug)
+    if slug.isascii():
+        # Map whitespace to hyphens and drop other characters in one pass
+        slug = slug.translate(_SLUG_TABLE)
+    else:
+        # Replace spaces with hyphens
+        slug = _WS_RE.sub('-', slug)
+        # Remove non-alphanumeric characters (except hyphens)
+        slug = _NON_SLUG_RE.sub('', slug)
     # Remove multiple consecutive hyphens
-    slug = re.sub(r'-+', '-', slug)
+    slug = _DASH_RE.sub('-', slug)
     # Remove leading/trailing hyphens
     slug = slug.strip('-')
     
@@ -120,11 +139,31 @@ def merge_dicts(base: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]
         Merged dictionary
     """
     result = base.copy()
+    # Walk nested levels with an explicit stack; a nested dict from base is
+    # copied only when updates actually merge into it
+    stack = [(result, updates)]
     
-    for key, value in updates.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-            result[key] = merge_dicts(result[key], value)
-        else:
-            result[key] = value
+    while stack:
+        dst, src = stack.pop()
+        for key, value in src.items():
+            current = dst.get(key)
+            if isinstance(current, dict) and isinstance(value, dict):
+                dst[key] = current = dict(current)
+                stack.append((current, value))
+            else:
+                dst[key] = value
     
     return result
+
+
+def strip_code_fence(text: str) -> str:
+    """
+    Remove a markdown code fence wrapped around a model response.
+    
+    Args:
+        text: Raw response text
+        
+    Returns:
+        Text without the leading ```json / ``` and trailing ``` fence
+    """
+    return _CODE_FENCE_RE.sub('', text).strip()
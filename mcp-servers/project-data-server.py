@@ -4,12 +4,26 @@ MCP Server for UofTHacks Project Data
 Exposes project configuration, structure, and data to Cursor AI assistant.
 """
 
+import functools
 import json
 import os
 import sys
 from pathlib import Path
 from typing import Any, List, Optional
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
 
@@ -19,6 +33,39 @@ def get_project_root() -> Path:
     return Path(__file__).parent.parent
 
 
+# Directories scanned by get_project_structure / get_data_files, relative to root
+STRUCTURE_DIRS = (
+    "backend/services",
+    "backend/routes",
+    "backend/graphs",
+    "pipeline",
+    "frontend/shopify-app",
+)
+DATA_DIRS = (
+    "backend/data",
+    "pipeline",
+)
+
+
+def _dumps(data: Any) -> str:
+    """Serialize a response payload as indented JSON (orjson when installed)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(data, indent=2)
+
+
+def _dir_mtimes(dirs: tuple) -> tuple:
+    """Modification times of the given directories (None if missing)."""
+    root = get_project_root()
+    mtimes = []
+    for rel in dirs:
+        try:
+            mtimes.append(os.stat(root / rel).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
 def get_config_info() -> dict:
     """Get configuration information."""
     config_file = get_project_root() / "backend" / "config.py"
@@ -43,31 +90,39 @@ def get_config_info() -> dict:
     return config_info
 
 
+def _list_files(rel_dir: str, ext: str) -> List[str]:
+    """
+    List files with the given extension in a project directory.
+    
+    Uses a single os.scandir pass (no per-entry Path objects or stat calls
+    beyond the directory read) and returns root-relative POSIX paths.
+    """
+    try:
+        with os.scandir(get_project_root() / rel_dir) as entries:
+            return [
+                f"{rel_dir}/{entry.name}"
+                for entry in entries
+                if entry.name.endswith(ext) and entry.is_file()
+            ]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
 def get_project_structure() -> dict:
     """Get project directory structure."""
-    root = get_project_root()
-    
-    structure = {
+    return {
         "backend": {
-            "services": list((root / "backend" / "services").glob("*.py")) if (root / "backend" / "services").exists() else [],
-            "routes": list((root / "backend" / "routes").glob("*.py")) if (root / "backend" / "routes").exists() else [],
-            "graphs": list((root / "backend" / "graphs").glob("*.py")) if (root / "backend" / "graphs").exists() else [],
+            "services": _list_files("backend/services", ".py"),
+            "routes": _list_files("backend/routes", ".py"),
+            "graphs": _list_files("backend/graphs", ".py"),
         },
         "pipeline": {
-            "files": list((root / "pipeline").glob("*.py")) if (root / "pipeline").exists() else [],
+            "files": _list_files("pipeline", ".py"),
         },
         "frontend": {
-            "shopify_app": list((root / "frontend" / "shopify-app").glob("*.js")) if (root / "frontend" / "shopify-app").exists() else [],
+            "shopify_app": _list_files("frontend/shopify-app", ".js"),
         }
     }
-    
-    # Convert Path objects to strings
-    for section in structure.values():
-        if isinstance(section, dict):
-            for key in section:
-                section[key] = [str(p.relative_to(root)) for p in section[key]]
-    
-    return structure
 
 
 def get_api_endpoints() -> dict:
@@ -101,18 +156,110 @@ def get_data_files() -> dict:
     data_files = {}
     
     # Backend data
-    backend_data = root / "backend" / "data"
-    if backend_data.exists():
-        data_files["backend"] = [str(p.relative_to(root)) for p in backend_data.glob("*.json")]
+    if (root / "backend" / "data").is_dir():
+        data_files["backend"] = _list_files("backend/data", ".json")
     
     # Pipeline data
-    pipeline_data = root / "pipeline"
-    if pipeline_data.exists():
-        data_files["pipeline"] = [str(p.relative_to(root)) for p in pipeline_data.glob("*.json")]
+    if (root / "pipeline").is_dir():
+        data_files["pipeline"] = _list_files("pipeline", ".json")
     
     return data_files
 
 
+# Serialized listings are cached per directory-mtime snapshot: adding, removing
+# or renaming a file bumps its directory's mtime and so produces a new key.
+@functools.lru_cache(maxsize=8)
+def _structure_json(mtimes: tuple) -> str:
+    return _dumps(get_project_structure())
+
+
+@functools.lru_cache(maxsize=8)
+def _data_files_json(mtimes: tuple) -> str:
+    return _dumps(get_data_files())
+
+
+# While a filesystem watcher is running, listings are cached until it reports
+# a change, so cache hits need no stat() calls at all. The generation counter
+# keeps a listing computed during a change from being stored as fresh.
+_watching = False
+_watch_generation = 0
+_watched_listings = {}
+
+
+def _invalidate_watched_listings() -> None:
+    global _watch_generation
+    _watch_generation += 1
+    _watched_listings.clear()
+
+
+def _watched_listing(name: str, build) -> str:
+    cached = _watched_listings.get(name)
+    if cached is None:
+        generation = _watch_generation
+        cached = _dumps(build())
+        if generation == _watch_generation:
+            _watched_listings[name] = cached
+    return cached
+
+
+if WATCHDOG_AVAILABLE:
+    class _ListingChangeHandler(FileSystemEventHandler):
+        """Invalidate cached listings when files are added, removed or renamed."""
+        
+        def on_created(self, event):
+            _invalidate_watched_listings()
+        
+        def on_deleted(self, event):
+            _invalidate_watched_listings()
+        
+        def on_moved(self, event):
+            _invalidate_watched_listings()
+
+
+def start_listing_watcher() -> Optional[Any]:
+    """
+    Watch the listed directories and switch listings to event-driven caching.
+    
+    Returns:
+        The running watchdog Observer, or None when watchdog is not installed
+        or a watched directory does not exist (mtime-keyed caching is used then)
+    """
+    global _watching
+    if not WATCHDOG_AVAILABLE:
+        return None
+    
+    root = get_project_root()
+    dirs = [root / rel for rel in dict.fromkeys(STRUCTURE_DIRS + DATA_DIRS)]
+    if not all(d.is_dir() for d in dirs):
+        # A missing directory can't be watched for later creation
+        return None
+    
+    observer = Observer()
+    handler = _ListingChangeHandler()
+    for d in dirs:
+        observer.schedule(handler, str(d), recursive=False)
+    observer.daemon = True
+    observer.start()
+    
+    _invalidate_watched_listings()
+    _watching = True
+    return observer
+
+
+def get_project_structure_json() -> str:
+    """Get the project structure as JSON, cached until a scanned directory changes."""
+    if _watching:
+        return _watched_listing("structure", get_project_structure)
+    return _structure_json(_dir_mtimes(STRUCTURE_DIRS))
+
+
+def get_data_files_json() -> str:
+    """Get the data file listing as JSON, cached until a data directory changes."""
+    if _watching:
+        return _watched_listing("data-files", get_data_files)
+    return _data_files_json(_dir_mtimes(DATA_DIRS))
+
+
 def main():
     """MCP Server main entry point using stdio."""
     import asyncio
@@ -156,13 +303,13 @@ def main():
     async def handle_read_resource(uri: str) -> str:
         """Read a specific project resource."""
         if uri == "project://config":
-            return json.dumps(get_config_info(), indent=2)
+            return _dumps(get_config_info())
         elif uri == "project://structure":
-            return json.dumps(get_project_structure(), indent=2)
+            return get_project_structure_json()
         elif uri == "project://endpoints":
-            return json.dumps(get_api_endpoints(), indent=2)
+            return _dumps(get_api_endpoints())
         elif uri == "project://data-files":
-            return json.dumps(get_data_files(), indent=2)
+            return get_data_files_json()
         else:
             return json.dumps({"error": f"Unknown resource: {uri}"})
     
@@ -210,25 +357,25 @@ def main():
         if name == "get_config":
             return [TextContent(
                 type="text",
-                text=json.dumps(get_config_info(), indent=2)
+                text=_dumps(get_config_info())
             )]
         
         elif name == "get_structure":
             return [TextContent(
                 type="text",
-                text=json.dumps(get_project_structure(), indent=2)
+                text=get_project_structure_json()
             )]
         
         elif name == "get_endpoints":
             return [TextContent(
                 type="text",
-                text=json.dumps(get_api_endpoints(), indent=2)
+                text=_dumps(get_api_endpoints())
             )]
         
         elif name == "get_data_files":
             return [TextContent(
                 type="text",
-                text=json.dumps(get_data_files(), indent=2)
+                text=get_data_files_json()
             )]
         
         else:
@@ -241,10 +388,14 @@ def main():
         async with stdio_server() as (read_stream, write_stream):
             await server.run(read_stream, write_stream, server.create_initialization_options())
     
+    observer = start_listing_watcher()
     try:
         asyncio.run(run())
     except KeyboardInterrupt:
         pass
+    finally:
+        if observer is not None:
+            observer.stop()
 
 
 if __name__ == "__main__":
@@ -4,11 +4,26 @@ MCP Server for UofTHacks Trends Data
 Exposes trend data from JSON files to Cursor AI assistant.
 """
 
+import bisect
+import functools
 import json
 import os
+import re
 import sys
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import stringzilla
+    STRINGZILLA_AVAILABLE = True
+except ImportError:
+    STRINGZILLA_AVAILABLE = False
 
 # Add parent directory to path to import backend services
 sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
@@ -36,24 +51,39 @@ def get_trends_data_file() -> Path:
     return backend_data
 
 
+def _dumps(data: Any) -> str:
+    """Serialize a response payload as indented JSON (orjson when installed)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(data, indent=2)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_cached(path: str, mtime_ns: int) -> tuple:
+    """Parse a trends file once per (path, mtime) version."""
+    raw = Path(path).read_bytes()
+    data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+    
+    # Handle different JSON structures
+    if isinstance(data, dict) and 'trends' in data:
+        return tuple(data['trends'])
+    elif isinstance(data, list):
+        return tuple(data)
+    else:
+        return ()
+
+
 def load_trends() -> List[dict]:
-    """Load trends from JSON file."""
+    """Load trends from JSON file (cached until the file changes)."""
     trends_file = get_trends_data_file()
     
-    if not trends_file.exists():
+    try:
+        mtime_ns = trends_file.stat().st_mtime_ns
+    except FileNotFoundError:
         return []
     
     try:
-        with open(trends_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Handle different JSON structures
-        if 'trends' in data:
-            return data['trends']
-        elif isinstance(data, list):
-            return data
-        else:
-            return []
+        return list(_load_cached(str(trends_file), mtime_ns))
     except Exception as e:
         print(f"Error loading trends: {e}", file=sys.stderr)
         return []
@@ -70,15 +100,101 @@ def list_trends() -> List[dict]:
     return load_trends()
 
 
+_TOKEN_RE = re.compile(r'\w+')
+
+
+class _SearchIndex:
+    """
+    Columnar view of the trends: position i of every column describes trends[i]
+    (string ids, lowercase name, description and platforms), so lookups walk
+    flat same-shape lists instead of probing each trend dict. Also holds a
+    word -> trend positions posting list over name/description, and the
+    vocabulary joined into one UTF-8 haystack so words containing a query
+    fragment are found with a single find() scan (SIMD via StringZilla when
+    installed, CPython's fastsearch otherwise).
+    """
+    
+    __slots__ = ('trends', 'ids', 'names', 'descs', 'platforms', 'postings', 'words', 'vocab', 'starts')
+    
+    def __init__(self, trends: List[dict]):
+        self.trends = tuple(trends)
+        self.ids: List[Tuple[str, str]] = []
+        self.names: List[str] = []
+        self.descs: List[str] = []
+        self.platforms: List[Tuple[str, ...]] = []
+        self.postings: Dict[str, Set[int]] = {}
+        for i, trend in enumerate(self.trends):
+            self.ids.append((str(trend.get('id')), str(trend.get('trend_id'))))
+            name = (trend.get('name') or '').lower()
+            desc = (trend.get('description') or '').lower()
+            self.names.append(name)
+            self.descs.append(desc)
+            # A 'platforms' list wins; otherwise fall back to the 'platform' string
+            platforms = trend.get('platforms', [])
+            if isinstance(platforms, list):
+                self.platforms.append(tuple(p.lower() for p in platforms))
+            else:
+                self.platforms.append(((trend.get('platform') or '').lower(),))
+            for token in _TOKEN_RE.findall(f"{name} {desc}"):
+                self.postings.setdefault(token, set()).add(i)
+        
+        # Words never contain '\n', so it is a safe separator
+        self.words = list(self.postings)
+        self.starts = []
+        offset = 0
+        encoded = []
+        for word in self.words:
+            data = word.encode('utf-8')
+            self.starts.append(offset)
+            encoded.append(data)
+            offset += len(data) + 1
+        vocab = b'\n'.join(encoded)
+        self.vocab = stringzilla.Str(vocab) if STRINGZILLA_AVAILABLE else vocab
+    
+    def positions_containing(self, token: str) -> Set[int]:
+        """Positions of trends with an indexed word that contains token."""
+        needle = token.encode('utf-8')
+        starts = self.starts
+        matched: Set[int] = set()
+        pos = self.vocab.find(needle)
+        while pos != -1:
+            i = bisect.bisect_right(starts, pos) - 1
+            matched |= self.postings[self.words[i]]
+            if i + 1 == len(starts):
+                break
+            pos = self.vocab.find(needle, starts[i + 1])
+        return matched
+
+
+def _trends_version() -> Optional[tuple]:
+    """(path, mtime) of the trends file, or None if it does not exist."""
+    trends_file = get_trends_data_file()
+    try:
+        return str(trends_file), trends_file.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_search_index(version: tuple) -> _SearchIndex:
+    return _SearchIndex(list_trends())
+
+
+def _search_index() -> _SearchIndex:
+    version = _trends_version()
+    if version is None:
+        return _SearchIndex(list_trends())
+    return _cached_search_index(version)
+
+
 def get_trend_by_id(trend_id: str) -> Optional[dict]:
     """Get a specific trend by ID."""
-    trends = list_trends()
+    index = _search_index()
+    trend_id = str(trend_id)
     
     # Try different ID fields
-    for trend in trends:
-        if trend.get('id') == trend_id or trend.get('trend_id') == trend_id:
-            return trend
-        if str(trend.get('id')) == str(trend_id) or str(trend.get('trend_id')) == str(trend_id):
+    for trend, (id_, alt_id) in zip(index.trends, index.ids):
+        if id_ == trend_id or alt_id == trend_id:
             return trend
     
     return None
@@ -86,34 +202,32 @@ def get_trend_by_id(trend_id: str) -> Optional[dict]:
 
 def search_trends(query: str) -> List[dict]:
     """Search trends by name or description."""
-    trends = list_trends()
+    index = _search_index()
     query_lower = query.lower()
     
-    results = []
-    for trend in trends:
-        name = trend.get('name', '').lower()
-        desc = trend.get('description', '').lower()
-        
-        if query_lower in name or query_lower in desc:
-            results.append(trend)
+    # Every word in the query must occur inside some indexed word of a
+    # matching trend, so narrow to those trends before the substring check
+    candidates = None
+    for token in set(_TOKEN_RE.findall(query_lower)):
+        matched = index.positions_containing(token)
+        candidates = matched if candidates is None else candidates & matched
+        if not candidates:
+            return []
     
-    return results
+    positions = range(len(index.trends)) if candidates is None else sorted(candidates)
+    
+    names, descs, trends = index.names, index.descs, index.trends
+    return [trends[i] for i in positions if query_lower in names[i] or query_lower in descs[i]]
 
 
 def get_trends_by_platform(platform: str) -> List[dict]:
     """Get trends by platform."""
-    trends = list_trends()
+    index = _search_index()
     platform_lower = platform.lower()
     
     results = []
-    for trend in trends:
-        platforms = trend.get('platforms', [])
-        platform_str = trend.get('platform', '')
-        
-        if isinstance(platforms, list):
-            if any(platform_lower in p.lower() for p in platforms):
-                results.append(trend)
-        elif platform_lower in platform_str.lower():
+    for trend, platforms in zip(index.trends, index.platforms):
+        if any(platform_lower in p for p in platforms):
             results.append(trend)
     
     return results
@@ -131,27 +245,29 @@ def main():
     @server.list_resources()
     async def handle_list_resources() -> List[Resource]:
         """List available trend resources."""
-        trends = list_trends()
-        return [
-            Resource(
+        resources = []
+        for i, trend in enumerate(await asyncio.to_thread(list_trends)):
+            description = trend.get('description', '')
+            if len(description) > 100:
+                description = description[:100] + '...'
+            resources.append(Resource(
                 uri=f"trend://{trend.get('id', i)}",
                 name=trend.get('name', f"Trend {i}"),
-                description=trend.get('description', '')[:100] + '...' if len(trend.get('description', '')) > 100 else trend.get('description', ''),
+                description=description,
                 mimeType="application/json"
-            )
-            for i, trend in enumerate(trends)
-        ]
+            ))
+        return resources
     
     @server.read_resource()
     async def handle_read_resource(uri: str) -> str:
         """Read a specific trend resource."""
         trend_id = uri.replace("trend://", "")
-        trend = get_trend_by_id(trend_id)
+        trend = await asyncio.to_thread(get_trend_by_id, trend_id)
         
         if not trend:
             return json.dumps({"error": f"Trend {trend_id} not found"})
         
-        return json.dumps(trend, indent=2)
+        return _dumps(trend)
     
     @server.list_tools()
     async def handle_list_tools() -> List[Tool]:
@@ -213,26 +329,26 @@ def main():
     async def handle_call_tool(name: str, arguments: dict) -> List[TextContent]:
         """Handle tool calls."""
         if name == "list_trends":
-            trends = list_trends()
+            trends = await asyncio.to_thread(list_trends)
             return [TextContent(
                 type="text",
-                text=json.dumps({"trends": trends, "count": len(trends)}, indent=2)
+                text=_dumps({"trends": trends, "count": len(trends)})
             )]
         
         elif name == "get_trend":
             trend_id = arguments.get("trend_id")
-            trend = get_trend_by_id(trend_id)
+            trend = await asyncio.to_thread(get_trend_by_id, trend_id)
             
             if not trend:
                 # Try search as fallback
-                trends = search_trends(trend_id)
+                trends = await asyncio.to_thread(search_trends, trend_id)
                 if trends:
                     trend = trends[0]
             
             if trend:
                 return [TextContent(
                     type="text",
-                    text=json.dumps(trend, indent=2)
+                    text=_dumps(trend)
                 )]
             else:
                 return [TextContent(
@@ -242,18 +358,18 @@ def main():
         
         elif name == "search_trends":
             query = arguments.get("query", "")
-            results = search_trends(query)
+            results = await asyncio.to_thread(search_trends, query)
             return [TextContent(
                 type="text",
-                text=json.dumps({"query": query, "results": results, "count": len(results)}, indent=2)
+                text=_dumps({"query": query, "results": results, "count": len(results)})
             )]
         
         elif name == "get_trends_by_platform":
             platform = arguments.get("platform", "")
-            results = get_trends_by_platform(platform)
+            results = await asyncio.to_thread(get_trends_by_platform, platform)
             return [TextContent(
                 type="text",
-                text=json.dumps({"platform": platform, "trends": results, "count": len(results)}, indent=2)
+                text=_dumps({"platform": platform, "trends": results, "count": len(results)})
             )]
         
         else:
@@ -277,13 +393,13 @@ if __name__ == "__main__":
     if len(sys.argv) > 1:
         if sys.argv[1] == "list":
             trends = list_trends()
-            print(json.dumps({"trends": trends, "count": len(trends)}, indent=2))
+            print(_dumps({"trends": trends, "count": len(trends)}))
         elif sys.argv[1] == "get" and len(sys.argv) > 2:
             trend = get_trend_by_id(sys.argv[2])
-            print(json.dumps(trend, indent=2) if trend else json.dumps({"error": "Not found"}))
+            print(_dumps(trend) if trend else json.dumps({"error": "Not found"}))
         elif sys.argv[1] == "search" and len(sys.argv) > 2:
             results = search_trends(sys.argv[2])
-            print(json.dumps({"results": results, "count": len(results)}, indent=2))
+            print(_dumps({"results": results, "count": len(results)}))
     else:
         # Try to run as MCP server
         main()
@@ -0,0 +1,49 @@
+"""
+MongoDB Access Module
+One process-wide MongoClient shared by the pipeline modules
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import config
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'video_analysis'))
+from config import MONGODB_CONNECTION_STRING
+
+DATABASE_NAME = "thewinningteam"
+
+# Created on first use; PyMongo pools connections and is thread-safe
+_client = None
+_trends_index_ready = False
+
+
+def get_client():
+    """
+    Get the shared MongoClient, creating it on first use
+
+    Returns:
+        MongoClient: Process-wide client
+    """
+    global _client
+    if _client is None:
+        # Imported here: pymongo (and its SRV/DNS stack) is slow to import and
+        # many entry points never touch the database
+        from pymongo import MongoClient
+        _client = MongoClient(MONGODB_CONNECTION_STRING, maxPoolSize=50, minPoolSize=5)
+    return _client
+
+
+def get_trends_collection():
+    """
+    Get the trends collection, ensuring its created_at index once per process
+
+    Returns:
+        Collection: The trends collection
+    """
+    global _trends_index_ready
+    collection = get_client()[DATABASE_NAME]["trends"]
+    if not _trends_index_ready:
+        # Lets created_at range queries and sorts use an index scan
+        collection.create_index([("created_at", -1)])
+        _trends_index_ready = True
+    return collection
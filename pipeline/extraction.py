@@ -15,9 +15,12 @@ import sys
 import time
 import json
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 GRAPHQL_PRODUCT_QUERY = '''
@@ -53,34 +56,58 @@ query shopInfo { shop { id name myshopifyDomain email primaryDomain { host } } }
 '''
 
 
-def _graphql_request(url: str, token: str, query: str, variables: dict):
-	headers = {
-		'Content-Type': 'application/json',
-		'X-Shopify-Access-Token': token,
-	}
+_session = None
+
+
+def _get_session() -> requests.Session:
+	# One keep-alive session so every page reuses the same TLS connection.
+	# Connection errors, 429 and 5xx are retried by urllib3 with exponential
+	# backoff (Retry-After is honoured).
+	global _session
+	if _session is None:
+		retry = Retry(
+			total=5,
+			backoff_factor=1.5,
+			status_forcelist=(429, 502, 503, 504),
+			allowed_methods=frozenset({'GET', 'POST'}),
+			raise_on_status=False,
+		)
+		_session = requests.Session()
+		_session.headers.update({'Content-Type': 'application/json'})
+		_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+	return _session
+
+
+def _graphql_response(url: str, token: str, query: str, variables: dict) -> dict:
+	"""POST a GraphQL query and return the full response body (data + extensions)."""
 	payload = {'query': query, 'variables': variables}
-	for attempt in range(1, 6):
-		try:
-			r = requests.post(url, headers=headers, json=payload, timeout=30)
-		except requests.RequestException as e:
-			wait = attempt * 1.5
-			time.sleep(wait)
-			if attempt == 5:
-				raise
-			continue
+	r = _get_session().post(url, headers={'X-Shopify-Access-Token': token}, json=payload, timeout=30)
 
-		if r.status_code == 200:
-			data = r.json()
-			if 'errors' in data:
-				raise RuntimeError(f"GraphQL errors: {data['errors']}")
-			return data.get('data')
-		elif r.status_code in (429, 502, 503, 504):
-			# rate limited or temporary error
-			wait = attempt * 2
-			time.sleep(wait)
-			continue
-		else:
-			raise RuntimeError(f"GraphQL request failed: {r.status_code} {r.text}")
+	if r.status_code == 200:
+		body = r.json()
+		if 'errors' in body:
+			raise RuntimeError(f"GraphQL errors: {body['errors']}")
+		return body
+	raise RuntimeError(f"GraphQL request failed: {r.status_code} {r.text}")
+
+
+def _graphql_request(url: str, token: str, query: str, variables: dict):
+	return _graphql_response(url, token, query, variables).get('data')
+
+
+def _throttle_wait(body: dict) -> float:
+	"""Seconds to wait so the next query of the same cost fits the leaky bucket."""
+	cost = (body.get('extensions') or {}).get('cost') or {}
+	status = cost.get('throttleStatus') or {}
+	requested = cost.get('requestedQueryCost')
+	available = status.get('currentlyAvailable')
+	restore_rate = status.get('restoreRate')
+	if requested is None or available is None or not restore_rate:
+		# No cost info: fall back to the old fixed politeness delay
+		return 0.3
+	if available >= requested:
+		return 0.0
+	return (requested - available) / restore_rate
 
 
 def fetch_shop_info(shop_domain: str, token: str, api_version: str = '2024-10') -> dict:
@@ -105,8 +132,16 @@ def _filter_shop(shop: dict) -> dict:
 	return out
 
 
+def _connection_nodes(value) -> list:
+	"""Nodes of a GraphQL connection ({'edges': [{'node': ...}]}) or an already-flat list."""
+	if isinstance(value, dict):
+		return [e['node'] for e in value.get('edges', [])]
+	return value or []
+
+
 def _filter_product_node(node: dict) -> dict:
-	# Keep only semantically meaningful fields and drop ids/dates/extra numeric metadata
+	# Keep only semantically meaningful fields and drop ids/dates/extra numeric metadata.
+	# Connections (images/variants/metafields) are unwrapped here from the raw node.
 	out = {}
 	# Product-level fields
 	for key in ('title', 'handle', 'vendor', 'productType', 'tags', 'description', 'descriptionHtml', 'onlineStoreUrl'):
@@ -115,7 +150,7 @@ def _filter_product_node(node: dict) -> dict:
 
 	# Images: keep only originalSrc and altText
 	imgs = []
-	for img in node.get('images', []):
+	for img in _connection_nodes(node.get('images')):
 		if not isinstance(img, dict):
 			continue
 		src = img.get('originalSrc') or img.get('src')
@@ -130,7 +165,7 @@ def _filter_product_node(node: dict) -> dict:
 
 	# Variants: keep title, sku, price
 	vars_out = []
-	for v in node.get('variants', []):
+	for v in _connection_nodes(node.get('variants')):
 		if not isinstance(v, dict):
 			continue
 		v_item = {}
@@ -144,7 +179,7 @@ def _filter_product_node(node: dict) -> dict:
 
 	# Metafields: keep namespace, key, type, value
 	mfs = []
-	for m in node.get('metafields', []):
+	for m in _connection_nodes(node.get('metafields')):
 		if not isinstance(m, dict):
 			continue
 		mf = {}
@@ -159,7 +194,8 @@ def _filter_product_node(node: dict) -> dict:
 	# Tags: ensure it's a list of strings if present
 	if 'tags' in out and isinstance(out['tags'], str):
 		# Shopify sometimes returns tags as comma-separated string
-		out['tags'] = [t.strip() for t in out['tags'].split(',') if t.strip()]
+		parts = (t.strip() for t in out['tags'].split(','))
+		out['tags'] = [p for p in parts if p]
 
 	return out
 
@@ -168,34 +204,33 @@ def fetch_all_products(shop_domain: str, token: str, api_version: str = '2024-10
 	url = f'https://{shop_domain}/admin/api/{api_version}/graphql.json'
 	products = []
 	first = 100
-	after = None
-
-	while True:
-		variables = {'first': first, 'after': after}
-		data = _graphql_request(url, token, GRAPHQL_PRODUCT_QUERY, variables)
-		if not data or 'products' not in data:
-			break
-
-		edges = data['products']['edges']
-		for edge in edges:
-			node = edge.get('node')
-			# simplify images/variants/metafields edges
-			if node is None:
-				continue
-			node['images'] = [e['node'] for e in node.get('images', {}).get('edges', [])]
-			node['variants'] = [e['node'] for e in node.get('variants', {}).get('edges', [])]
-			node['metafields'] = [e['node'] for e in node.get('metafields', {}).get('edges', [])]
-			# filter to only semantically meaningful fields
-			filtered = _filter_product_node(node)
-			products.append(filtered)
-
-		page_info = data['products']['pageInfo']
-		if page_info.get('hasNextPage'):
-			after = edges[-1]['cursor'] if edges else None
-			# be polite
-			time.sleep(0.3)
-			continue
-		break
+
+	# Cursor pagination is inherently serial, but the next page can be in
+	# flight while the current one is filtered. Pacing follows Shopify's
+	# reported query cost instead of a fixed sleep.
+	with ThreadPoolExecutor(max_workers=1) as executor:
+		pending = executor.submit(_graphql_response, url, token, GRAPHQL_PRODUCT_QUERY, {'first': first, 'after': None})
+		while pending is not None:
+			body = pending.result()
+			pending = None
+			data = body.get('data')
+			if not data or 'products' not in data:
+				break
+
+			edges = data['products']['edges']
+			page_info = data['products']['pageInfo']
+			if page_info.get('hasNextPage') and edges:
+				wait = _throttle_wait(body)
+				if wait:
+					time.sleep(wait)
+				variables = {'first': first, 'after': edges[-1]['cursor']}
+				pending = executor.submit(_graphql_response, url, token, GRAPHQL_PRODUCT_QUERY, variables)
+
+			for edge in edges:
+				node = edge.get('node')
+				if node is None:
+					continue
+				products.append(_filter_product_node(node))
 
 	return products
 
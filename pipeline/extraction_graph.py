@@ -9,9 +9,17 @@ import sys
 import time
 import json
 import argparse
-from typing import Optional, List, TypedDict, Any
+from typing import Optional, List, TypedDict, Any, Iterable, Iterator
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # --- LANGGRAPH IMPORTS ---
 from langgraph.graph import StateGraph, END, START
@@ -49,35 +57,104 @@ GRAPHQL_SHOP_QUERY = '''
 query shopInfo { shop { id name myshopifyDomain email primaryDomain { host } } }
 '''
 
+# Bulk export of the same product fields. Nested connections come back as
+# separate JSONL lines carrying __parentId, so child nodes ask for __typename.
+BULK_PRODUCT_QUERY = '''
+{
+  products {
+    edges {
+      node {
+        id
+        title
+        handle
+        vendor
+        productType
+        tags
+        publishedAt
+        createdAt
+        updatedAt
+        descriptionHtml
+        description
+        onlineStoreUrl
+        images { edges { node { __typename id altText originalSrc width height } } }
+        variants { edges { node { __typename id title sku price inventoryQuantity } } }
+        metafields { edges { node { __typename id namespace key type value } } }
+      }
+    }
+  }
+}
+'''
+
+BULK_RUN_QUERY_MUTATION = '''
+mutation runBulkQuery($query: String!) {
+  bulkOperationRunQuery(query: $query) {
+    bulkOperation { id status }
+    userErrors { field message }
+  }
+}
+'''
+
+CURRENT_BULK_QUERY = '''
+query currentBulkQuery {
+  currentBulkOperation(type: QUERY) { id status errorCode objectCount url }
+}
+'''
+
+BULK_POLL_INTERVAL = 5
+BULK_MAX_WAIT = 1800
+# Distinct parents whose child rows may be buffered before the parent line
+BULK_PENDING_PARENTS_MAX = 1000
+
+# JSONL child __typename -> list key on the parent product node
+_BULK_CHILD_KEYS = {'Image': 'images', 'ProductImage': 'images', 'ProductVariant': 'variants', 'Metafield': 'metafields'}
+
 
 # --- HELPER FUNCTIONS (Unchanged Logic) ---
+def _loads(data):
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def _dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON bytes (orjson when installed)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+_session = None
+
+
+def _get_session() -> requests.Session:
+    """
+    Shared keep-alive session: every GraphQL page and the bulk download reuse
+    pooled connections. Transient failures (connection errors, 429 and 5xx)
+    are retried by urllib3 with exponential backoff, honouring Retry-After.
+    """
+    global _session
+    if _session is None:
+        retry = Retry(
+            total=5,
+            backoff_factor=1.5,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset({'GET', 'POST'}),
+            raise_on_status=False,
+        )
+        _session = requests.Session()
+        _session.headers.update({'Content-Type': 'application/json'})
+        _session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+    return _session
+
+
 def _graphql_request(url: str, token: str, query: str, variables: dict):
-    headers = {
-        'Content-Type': 'application/json',
-        'X-Shopify-Access-Token': token,
-    }
     payload = {'query': query, 'variables': variables}
-    for attempt in range(1, 6):
-        try:
-            r = requests.post(url, headers=headers, json=payload, timeout=30)
-        except requests.RequestException as e:
-            wait = attempt * 1.5
-            time.sleep(wait)
-            if attempt == 5:
-                raise
-            continue
+    r = _get_session().post(url, headers={'X-Shopify-Access-Token': token}, json=payload, timeout=30)
 
-        if r.status_code == 200:
-            data = r.json()
-            if 'errors' in data:
-                raise RuntimeError(f"GraphQL errors: {data['errors']}")
-            return data.get('data')
-        elif r.status_code in (429, 502, 503, 504):
-            wait = attempt * 2
-            time.sleep(wait)
-            continue
-        else:
-            raise RuntimeError(f"GraphQL request failed: {r.status_code} {r.text}")
+    if r.status_code == 200:
+        data = _loads(r.content)
+        if 'errors' in data:
+            raise RuntimeError(f"GraphQL errors: {data['errors']}")
+        return data.get('data')
+    raise RuntimeError(f"GraphQL request failed: {r.status_code} {r.text}")
 
 
 def fetch_shop_info(shop_domain: str, token: str, api_version: str) -> dict:
@@ -102,14 +179,23 @@ def _filter_shop(shop: dict) -> dict:
     return out
 
 
+def _connection_nodes(value) -> list:
+    """Nodes of a GraphQL connection ({'edges': [{'node': ...}]}) or an already-flat list."""
+    if isinstance(value, dict):
+        return [e['node'] for e in value.get('edges', [])]
+    return value or []
+
+
 def _filter_product_node(node: dict) -> dict:
+    # Accepts raw GraphQL nodes (connections unwrapped here) or bulk-export
+    # nodes whose children are already flat lists
     out = {}
     for key in ('title', 'handle', 'vendor', 'productType', 'tags', 'description', 'descriptionHtml', 'onlineStoreUrl'):
         if key in node and node.get(key) not in (None, '', []):
             out[key] = node.get(key)
 
     imgs = []
-    for img in node.get('images', []):
+    for img in _connection_nodes(node.get('images')):
         if not isinstance(img, dict): continue
         src = img.get('originalSrc') or img.get('src')
         alt = img.get('altText') or img.get('alt')
@@ -120,7 +206,7 @@ def _filter_product_node(node: dict) -> dict:
     if imgs: out['images'] = imgs
 
     vars_out = []
-    for v in node.get('variants', []):
+    for v in _connection_nodes(node.get('variants')):
         if not isinstance(v, dict): continue
         v_item = {}
         for vk in ('title', 'sku', 'price'):
@@ -130,7 +216,7 @@ def _filter_product_node(node: dict) -> dict:
     if vars_out: out['variants'] = vars_out
 
     mfs = []
-    for m in node.get('metafields', []):
+    for m in _connection_nodes(node.get('metafields')):
         if not isinstance(m, dict): continue
         mf = {}
         for mk in ('namespace', 'key', 'type', 'value'):
@@ -140,14 +226,15 @@ def _filter_product_node(node: dict) -> dict:
     if mfs: out['metafields'] = mfs
 
     if 'tags' in out and isinstance(out['tags'], str):
-        out['tags'] = [t.strip() for t in out['tags'].split(',') if t.strip()]
+        parts = (t.strip() for t in out['tags'].split(','))
+        out['tags'] = [p for p in parts if p]
 
     return out
 
 
-def fetch_all_products(shop_domain: str, token: str, api_version: str) -> list:
+def fetch_all_products(shop_domain: str, token: str, api_version: str) -> Iterator[dict]:
+    """Yield filtered products page by page via cursor pagination."""
     url = f'https://{shop_domain}/admin/api/{api_version}/graphql.json'
-    products = []
     first = 100
     after = None
 
@@ -161,11 +248,7 @@ def fetch_all_products(shop_domain: str, token: str, api_version: str) -> list:
         for edge in edges:
             node = edge.get('node')
             if node is None: continue
-            node['images'] = [e['node'] for e in node.get('images', {}).get('edges', [])]
-            node['variants'] = [e['node'] for e in node.get('variants', {}).get('edges', [])]
-            node['metafields'] = [e['node'] for e in node.get('metafields', {}).get('edges', [])]
-            filtered = _filter_product_node(node)
-            products.append(filtered)
+            yield _filter_product_node(node)
 
         page_info = data['products']['pageInfo']
         if page_info.get('hasNextPage'):
@@ -174,7 +257,98 @@ def fetch_all_products(shop_domain: str, token: str, api_version: str) -> list:
             continue
         break
 
-    return products
+
+def _run_bulk_products_query(url: str, token: str) -> Optional[str]:
+    """
+    Start a bulk products export and wait for it to finish.
+
+    Returns the JSONL download URL, or None when the store has no products.
+    Raises RuntimeError if the operation cannot be started or does not complete.
+    """
+    data = _graphql_request(url, token, BULK_RUN_QUERY_MUTATION, {'query': BULK_PRODUCT_QUERY})
+    result = (data or {}).get('bulkOperationRunQuery') or {}
+    if result.get('userErrors'):
+        raise RuntimeError(f"Bulk operation rejected: {result['userErrors']}")
+    operation_id = (result.get('bulkOperation') or {}).get('id')
+    if not operation_id:
+        raise RuntimeError('Bulk operation did not start')
+
+    deadline = time.monotonic() + BULK_MAX_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(BULK_POLL_INTERVAL)
+        data = _graphql_request(url, token, CURRENT_BULK_QUERY, {})
+        operation = (data or {}).get('currentBulkOperation') or {}
+        if operation.get('id') != operation_id:
+            raise RuntimeError('Bulk operation was replaced by another bulk query')
+        status = operation.get('status')
+        if status == 'COMPLETED':
+            return operation.get('url')
+        if status in ('FAILED', 'CANCELED', 'EXPIRED'):
+            raise RuntimeError(f"Bulk operation {status.lower()}: {operation.get('errorCode')}")
+        print(f"   bulk export {status.lower() if status else 'pending'} ({operation.get('objectCount', 0)} objects)")
+
+    raise RuntimeError('Timed out waiting for bulk operation')
+
+
+def _iter_bulk_products(jsonl_url: str) -> Iterator[dict]:
+    """
+    Stream a bulk export and yield each filtered product.
+
+    Shopify writes a product's nested images/variants/metafields lines right
+    after the product line, so a product is complete once the next top-level
+    line appears and only one product is held in memory at a time. Children
+    that arrive before their product are buffered until it appears; children
+    whose product was already yielded (or never appears) are counted and
+    reported instead of being dropped silently.
+    """
+    current = None
+    pending = {}  # parent id -> [(key, child)] seen before the parent line
+    orphans = 0
+    with _get_session().get(jsonl_url, stream=True, timeout=(5, 60)) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            if not line:
+                continue
+            obj = _loads(line)
+            parent_id = obj.pop('__parentId', None)
+            if parent_id is None:
+                if current is not None:
+                    yield _filter_product_node(current)
+                obj.update(images=[], variants=[], metafields=[])
+                for key, child in pending.pop(obj.get('id'), ()):
+                    obj[key].append(child)
+                current = obj
+                continue
+            key = _BULK_CHILD_KEYS.get(obj.pop('__typename', None))
+            if not key:
+                continue
+            if current is not None and current.get('id') == parent_id:
+                current[key].append(obj)
+            elif len(pending) < BULK_PENDING_PARENTS_MAX:
+                pending.setdefault(parent_id, []).append((key, obj))
+            else:
+                orphans += 1
+
+    if current is not None:
+        yield _filter_product_node(current)
+
+    orphans += sum(len(children) for children in pending.values())
+    if orphans:
+        print(f"⚠️ Bulk export: {orphans} child rows could not be attached to their product and were skipped")
+
+
+def fetch_all_products_bulk(shop_domain: str, token: str, api_version: str) -> Iterator[dict]:
+    """
+    Export all products with one bulk operation and a single JSONL download.
+
+    The operation is started and awaited eagerly (so failures surface here);
+    the download is streamed lazily by the returned iterator.
+    """
+    url = f'https://{shop_domain}/admin/api/{api_version}/graphql.json'
+    jsonl_url = _run_bulk_products_query(url, token)
+    if not jsonl_url:
+        return iter(())
+    return _iter_bulk_products(jsonl_url)
 
 
 # --- LANGGRAPH IMPLEMENTATION ---
@@ -189,7 +363,7 @@ class ExtractionState(TypedDict):
     
     # Internal Storage
     shop_metadata: dict
-    products: List[dict]
+    products: Iterable[dict]
     
     # Status
     status: str
@@ -203,24 +377,58 @@ def node_get_shop_info(state: ExtractionState):
     return {"shop_metadata": clean_info}
 
 def node_get_products(state: ExtractionState):
-    """Fetches all products via pagination."""
+    """Starts the product export (bulk, falling back to pagination); products stream into save_file."""
     print(f"[{state['store']}] Fetching products (this may take a while)...")
-    prods = fetch_all_products(state['store'], state['token'], state['api_version'])
+    try:
+        prods = fetch_all_products_bulk(state['store'], state['token'], state['api_version'])
+    except (RuntimeError, requests.RequestException) as e:
+        print(f"⚠️ Bulk export unavailable ({e}), paginating instead...")
+        prods = fetch_all_products(state['store'], state['token'], state['api_version'])
     return {"products": prods}
 
 def node_save_export(state: ExtractionState):
-    """Writes the final JSON to disk."""
-    payload = {
+    """
+    Streams the export to disk one product at a time.
+
+    A `.jsonl` output gets a header line (exported_at, shop) followed by one
+    product per line; any other path gets a single compact JSON object.
+    The export is written to a temporary file next to out_path and only
+    moved into place once every product has been written, so a failed
+    download leaves the previous export untouched.
+    """
+    header = {
         'exported_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
         'shop': state['shop_metadata'],
-        'products_count': len(state['products']),
-        'products': state['products'],
     }
-    
-    with open(state['out_path'], 'w', encoding='utf-8') as f:
-        json.dump(payload, f, indent=2, ensure_ascii=False)
-        
-    print(f"✅ Success! Wrote export to {state['out_path']} ({len(state['products'])} products)")
+    count = 0
+    out_path = state['out_path']
+    tmp_path = out_path + '.tmp'
+
+    try:
+        with open(tmp_path, 'wb') as f:
+            if out_path.endswith('.jsonl'):
+                f.write(_dumps(header))
+                f.write(b'\n')
+                for product in state['products']:
+                    f.write(_dumps(product))
+                    f.write(b'\n')
+                    count += 1
+            else:
+                f.write(_dumps(header)[:-1])
+                f.write(b',"products":[')
+                for product in state['products']:
+                    if count:
+                        f.write(b',')
+                    f.write(_dumps(product))
+                    count += 1
+                f.write(b'],"products_count":%d}' % count)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    print(f"✅ Success! Wrote export to {state['out_path']} ({count} products)")
     return {"status": "completed"}
 
 # 3. Build the Graph
@@ -9,10 +9,71 @@ from datetime import datetime
 import sys
 import os
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+    JSON_PARSE_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+except ImportError:
+    IJSON_AVAILABLE = False
+    JSON_PARSE_ERRORS = (json.JSONDecodeError,)
+
 # Add parent directory to path to import config
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'video_analysis'))
 from config import GEMINI_API_KEY
 
+def _loads(data):
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def _dumps_compact(obj):
+    """Compact JSON text for embedding in the prompt."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+# Longest product description passed to Gemini
+MAX_DESCRIPTION_CHARS = 400
+
+
+def _compact_product(product):
+    """Keep only the product fields the recommendation prompt uses."""
+    return {
+        'title': product.get('title'),
+        'tags': product.get('tags'),
+        'description': (product.get('description') or '')[:MAX_DESCRIPTION_CHARS]
+    }
+
+
+def load_compact_products(shopify_json_path):
+    """
+    Load products from a Shopify export, projected down to title/tags/description.
+
+    With ijson installed the file is streamed, so only one full product is held
+    in memory at a time; otherwise the whole file is parsed at once. A `.jsonl`
+    export (header line, then one product per line) is read line by line.
+
+    Args:
+        shopify_json_path: Path to Shopify products JSON
+
+    Returns:
+        list: Compact product dicts
+    """
+    with open(shopify_json_path, 'rb') as f:
+        if shopify_json_path.endswith('.jsonl'):
+            next(f, None)  # header: exported_at / shop
+            return [_compact_product(_loads(line)) for line in f if line.strip()]
+        if IJSON_AVAILABLE:
+            return [_compact_product(p) for p in ijson.items(f, 'products.item', use_float=True)]
+        data = _loads(f.read())
+    return [_compact_product(p) for p in data.get('products', [])]
+
 
 def generate_store_recommendations(twelve_labs_json_path, shopify_json_path, output_path):
     """
@@ -20,7 +81,8 @@ def generate_store_recommendations(twelve_labs_json_path, shopify_json_path, out
     sends to Gemini for store optimization recommendations
 
     Args:
-        twelve_labs_json_path: Path to Twelve Labs analysis JSON
+        twelve_labs_json_path: Path to Twelve Labs analysis JSON, or the
+            already-loaded analysis dict
         shopify_json_path: Path to Shopify products JSON
         output_path: Path to save Gemini recommendations
 
@@ -32,8 +94,11 @@ def generate_store_recommendations(twelve_labs_json_path, shopify_json_path, out
 
     # Load Twelve Labs analysis
     try:
-        with open(twelve_labs_json_path, 'r') as f:
-            trends_data = json.load(f)
+        if isinstance(twelve_labs_json_path, dict):
+            trends_data = twelve_labs_json_path
+        else:
+            with open(twelve_labs_json_path, 'rb') as f:
+                trends_data = _loads(f.read())
         print(f"✓ Loaded Twelve Labs analysis ({len(trends_data.get('trends', []))} trends)")
     except FileNotFoundError:
         print(f"✗ Error: {twelve_labs_json_path} not found")
@@ -44,14 +109,12 @@ def generate_store_recommendations(twelve_labs_json_path, shopify_json_path, out
 
     # Load Shopify products
     try:
-        with open(shopify_json_path, 'r') as f:
-            shopify_data = json.load(f)
-        product_count = len(shopify_data.get('products', []))
-        print(f"✓ Loaded Shopify products ({product_count} products)")
+        products = load_compact_products(shopify_json_path)
+        print(f"✓ Loaded Shopify products ({len(products)} products)")
     except FileNotFoundError:
         print(f"✗ Error: {shopify_json_path} not found")
         raise
-    except json.JSONDecodeError as e:
+    except JSON_PARSE_ERRORS as e:
         print(f"✗ Error parsing {shopify_json_path}: {e}")
         raise
 
@@ -73,10 +136,10 @@ def generate_store_recommendations(twelve_labs_json_path, shopify_json_path, out
 You are an expert e-commerce and SEO consultant. Analyze the following data and provide actionable recommendations.
 
 SOCIAL MEDIA TRENDS (from video analysis):
-{json.dumps(trends_data, indent=2)}
+{_dumps_compact(trends_data)}
 
 SHOPIFY STORE PRODUCTS:
-{json.dumps(shopify_data, indent=2)}
+{_dumps_compact({'products': products})}
 
 Based on this information, generate recommendations for how the Shopify store should adapt to align with current social media trends for better SEO and conversions.
 
@@ -217,7 +280,7 @@ Return ONLY the JSON, no markdown formatting or explanatory text.
         print("Parsing JSON...")
 
         # Parse JSON
-        recommendations = json.loads(response_text)
+        recommendations = _loads(response_text)
 
         # Validate structure
         if "trends" not in recommendations:
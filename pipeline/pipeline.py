@@ -4,25 +4,57 @@
 # 3. Feed results to Gemini for store recommendations
 # 4. Store Gemini output in MongoDB
 
+import asyncio
 import sys
 import json
+import threading
 from datetime import datetime
 
-from trend_identification.trends import fetch_genz_trends
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from trend_identification.trends import fetch_genz_trends_async, close_session
 from video_analysis.analyze_trending_videos import analyze_trend
 from gemini_integration import generate_store_recommendations
 from store_recommendations import store_gemini_recommendations
 
 ANALYZED_VIDEOS_COUNT_AT_A_TIME = 1
 TRENDS_IDENTIFIED_COUNT_AT_A_TIME = 7
+MAX_CONCURRENT_TREND_ANALYSES = 4
+
+
+def save_json(path, data):
+    """Write data to path as indented JSON."""
+    if ORJSON_AVAILABLE:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+
+async def analyze_trend_bounded(semaphore, idx, total, trend):
+    """Analyze one trend in a worker thread, with at most N trends in flight."""
+    async with semaphore:
+        print(f"\n[{idx}/{total}] Analyzing: {trend['name']}")
+        # Analyze trend with YouTube + Twelve Labs
+        return await asyncio.to_thread(
+            analyze_trend, trend["name"], count=ANALYZED_VIDEOS_COUNT_AT_A_TIME
+        )
 
 
-def main():
+async def main():
     print("=" * 60)
     print("STEP 1: Fetch Gen Z Trends from Perplexity")
     print("=" * 60)
 
-    trends_response = fetch_genz_trends(count=TRENDS_IDENTIFIED_COUNT_AT_A_TIME)
+    try:
+        trends_response = await fetch_genz_trends_async(count=TRENDS_IDENTIFIED_COUNT_AT_A_TIME)
+    finally:
+        await close_session()
     trends = trends_response["trends"]
 
     print(f"✓ Found {len(trends)} trends\n")
@@ -31,15 +63,22 @@ def main():
     print("STEP 2: Analyze Trends with YouTube + Twelve Labs")
     print("=" * 60)
 
+    # Trends are independent and I/O-bound, so analyze them concurrently
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_TREND_ANALYSES)
+    results = await asyncio.gather(
+        *(analyze_trend_bounded(semaphore, idx, len(trends), trend)
+          for idx, trend in enumerate(trends, 1)),
+        return_exceptions=True
+    )
+
     analyzed_trends = []
 
-    for idx, trend in enumerate(trends, 1):
-        print(f"\n[{idx}/{len(trends)}] Analyzing: {trend['name']}")
+    for idx, (trend, analysis) in enumerate(zip(trends, results), 1):
+        if isinstance(analysis, Exception):
+            print(f"✗ Error analyzing {trend['name']}: {analysis}")
+            continue
 
         try:
-            # Analyze trend with YouTube + Twelve Labs
-            analysis = analyze_trend(trend["name"], count=ANALYZED_VIDEOS_COUNT_AT_A_TIME)
-
             # Combine trend metadata with video analysis
             trend_with_analysis = {
                 "trend_id": trend.get("trend_id", idx),
@@ -52,7 +91,7 @@ def main():
                 "analyzed_videos": analysis["sample_videos"]
             }
             analyzed_trends.append(trend_with_analysis)
-            print(f"✓ Analyzed {len(analysis['sample_videos'])} videos")
+            print(f"✓ Analyzed {trend['name']}: {len(analysis['sample_videos'])} videos")
 
         except Exception as e:
             print(f"✗ Error analyzing {trend['name']}: {e}")
@@ -64,11 +103,13 @@ def main():
         "trends": analyzed_trends
     }
 
+    # The file is only an artifact (Gemini gets the dict directly), so write
+    # it in the background while STEP 3 runs
     twelve_labs_file = "twelve_labs_analysis.json"
-    with open(twelve_labs_file, "w") as f:
-        json.dump(twelve_labs_output, f, indent=2)
+    save_thread = threading.Thread(target=save_json, args=(twelve_labs_file, twelve_labs_output))
+    save_thread.start()
 
-    print(f"\n✓ Saved Twelve Labs analysis to {twelve_labs_file}")
+    print(f"\n✓ Saving Twelve Labs analysis to {twelve_labs_file}")
     print(f"✓ Total trends analyzed: {len(analyzed_trends)}")
 
     print("\n" + "=" * 60)
@@ -77,7 +118,7 @@ def main():
 
     try:
         recommendations = generate_store_recommendations(
-            twelve_labs_json_path=twelve_labs_file,
+            twelve_labs_json_path=twelve_labs_output,
             shopify_json_path="shop_export.json",
             output_path="gemini_recommendations.json"
         )
@@ -86,6 +127,8 @@ def main():
         print(f"✗ Error generating Gemini recommendations: {e}")
         sys.exit(1)
 
+    save_thread.join()
+
     print("\n" + "=" * 60)
     print("STEP 4: Store Recommendations in MongoDB")
     print("=" * 60)
@@ -107,4 +150,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
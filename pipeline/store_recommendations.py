@@ -3,15 +3,18 @@ MongoDB Storage Module
 Stores each Gemini trend recommendation as a separate document in MongoDB
 """
 
-from pymongo import MongoClient
-from datetime import datetime
+from datetime import datetime, timezone
 import json
 import sys
 import os
 
-# Add parent directory to path to import config
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'video_analysis'))
-from config import MONGODB_CONNECTION_STRING
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from db import get_trends_collection
 
 
 def store_gemini_recommendations(recommendations_json_path):
@@ -30,8 +33,9 @@ def store_gemini_recommendations(recommendations_json_path):
 
     # Load recommendations
     try:
-        with open(recommendations_json_path, 'r') as f:
-            data = json.load(f)
+        with open(recommendations_json_path, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
         print(f"✓ Loaded recommendations ({len(data.get('trends', []))} trends)")
     except FileNotFoundError:
         print(f"✗ Error: {recommendations_json_path} not found")
@@ -40,47 +44,47 @@ def store_gemini_recommendations(recommendations_json_path):
         print(f"✗ Error parsing {recommendations_json_path}: {e}")
         raise
 
-    # Connect to MongoDB
-    print("Connecting to MongoDB...")
-    try:
-        client = MongoClient(MONGODB_CONNECTION_STRING)
-
-        # Test connection
-        client.admin.command('ping')
-        print("✓ Connected to MongoDB Atlas")
-
-        # Access database and collection
-        db = client["thewinningteam"]
-        collection = db["trends"]  # Changed to "trends" collection
-
-    except Exception as e:
-        print(f"✗ Error connecting to MongoDB: {e}")
-        raise
-
     print(f"Storing individual trend documents in MongoDB...")
 
     try:
-        # Clear old trends (overwrite strategy)
-        delete_result = collection.delete_many({})
-        print(f"✓ Cleared {delete_result.deleted_count} old trend(s)")
-
-        # Insert each trend as a separate document
-        inserted_ids = []
+        collection = get_trends_collection()
+
+        # Clear old trends (overwrite strategy): dropping the collection is
+        # constant-time on the server, unlike deleting documents one by one
+        from pymongo.errors import OperationFailure
+        try:
+            collection.drop()
+        except OperationFailure:
+            pass
+        # drop() removes indexes too; restore the one the exclusion lookup uses
+        collection.create_index([("created_at", -1)])
+        print("✓ Cleared old trends")
+
+        # Insert every trend as a separate document in one batch
         trends = data.get("trends", [])
+        last_updated = data.get("last_updated")
+        source = data.get("source", "Gemini Analysis")
+        version = data.get("version", "1.0")
+        now = datetime.now(timezone.utc)
 
-        for trend in trends:
-            # Create document with trend data + metadata
-            trend_document = {
+        trend_documents = [
+            {
                 **trend,  # Spread all trend fields (id, name, description, etc.)
-                "last_updated": data.get("last_updated"),
-                "source": data.get("source", "Gemini Analysis"),
-                "version": data.get("version", "1.0"),
-                "created_at": datetime.now()
+                "last_updated": last_updated,
+                "source": source,
+                "version": version,
+                "created_at": now
             }
+            for trend in trends
+        ]
 
-            result = collection.insert_one(trend_document)
-            inserted_ids.append(str(result.inserted_id))
-            print(f"  ✓ Stored trend: {trend.get('name')} (ID: {result.inserted_id})")
+        inserted_ids = []
+        if trend_documents:
+            # Unordered so one bad document does not abort the rest of the batch
+            result = collection.insert_many(trend_documents, ordered=False)
+            inserted_ids = [str(inserted_id) for inserted_id in result.inserted_ids]
+            for trend, inserted_id in zip(trends, inserted_ids):
+                print(f"  ✓ Stored trend: {trend.get('name')} (ID: {inserted_id})")
 
         print(f"\n✓ Stored {len(inserted_ids)} trend documents successfully")
 
@@ -89,8 +93,6 @@ def store_gemini_recommendations(recommendations_json_path):
     except Exception as e:
         print(f"✗ Error storing recommendations in MongoDB: {e}")
         raise
-    finally:
-        client.close()
 
 
 def retrieve_all_trends():
@@ -101,13 +103,8 @@ def retrieve_all_trends():
         list: List of trend documents
     """
 
-    print("Connecting to MongoDB...")
     try:
-        client = MongoClient(MONGODB_CONNECTION_STRING)
-        client.admin.command('ping')
-
-        db = client["thewinningteam"]
-        collection = db["trends"]
+        collection = get_trends_collection()
 
         # Get all trend documents, sorted by created_at
         trends = list(collection.find().sort("created_at", -1))
@@ -123,8 +120,6 @@ def retrieve_all_trends():
     except Exception as e:
         print(f"✗ Error retrieving trends: {e}")
         raise
-    finally:
-        client.close()
 
 
 def retrieve_trend_by_id(trend_id):
@@ -139,11 +134,7 @@ def retrieve_trend_by_id(trend_id):
     """
 
     try:
-        client = MongoClient(MONGODB_CONNECTION_STRING)
-        client.admin.command('ping')
-
-        db = client["thewinningteam"]
-        collection = db["trends"]
+        collection = get_trends_collection()
 
         # Find trend by id field
         trend = collection.find_one({"id": trend_id})
@@ -158,8 +149,6 @@ def retrieve_trend_by_id(trend_id):
     except Exception as e:
         print(f"✗ Error retrieving trend: {e}")
         raise
-    finally:
-        client.close()
 
 
 if __name__ == "__main__":
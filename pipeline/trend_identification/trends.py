@@ -1,10 +1,35 @@
 
 import os
 import json
-import requests
-from config import PERPLEXITY_KEY, MONGODB_CONNECTION_STRING
-from datetime import datetime, timedelta
-from pymongo import MongoClient
+import asyncio
+import hashlib
+import re
+import tempfile
+import time
+import sys
+import aiohttp
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential
+
+# Add pipeline directory to path to import the shared db module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from db import get_trends_collection
+from config import PERPLEXITY_KEY
+from datetime import datetime, timedelta, timezone
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _loads(data):
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+def _dumps_pretty(obj) -> str:
+    """Indented JSON text (non-ASCII kept as-is)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, indent=2, ensure_ascii=False)
 
 # Configuration
 
@@ -13,6 +38,125 @@ API_KEY = PERPLEXITY_KEY
 
 API_URL = "https://api.perplexity.ai/chat/completions"
 
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=60)
+
+# Transient failures (rate limits, gateway errors, dropped connections) are retried
+MAX_ATTEMPTS = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_WAIT = 30
+_backoff = wait_exponential(multiplier=1, min=2, max=MAX_RETRY_WAIT)
+
+# Markdown code fence the model sometimes wraps its JSON in (closing fence optional)
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*(?:```\s*)?$", re.DOTALL)
+
+# On-disk memo of successful Perplexity results, keyed by (count, hour)
+TRENDS_CACHE_DIR = os.getenv("TRENDS_CACHE_DIR", ".cache")
+TRENDS_CACHE_TTL = int(os.getenv("TRENDS_CACHE_TTL", "3600"))  # seconds, 0 disables
+
+# Shared aiohttp session (created lazily inside the running event loop)
+_session = None
+
+
+def _new_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(limit=20, keepalive_timeout=60)
+    return aiohttp.ClientSession(connector=connector, timeout=REQUEST_TIMEOUT)
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Get or create the shared aiohttp session for Perplexity calls"""
+    global _session
+    if _session is None or _session.closed:
+        _session = _new_session()
+    return _session
+
+
+async def close_session():
+    """Close the shared aiohttp session"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+def _is_transient(exc) -> bool:
+    """Whether a failed Perplexity call is worth retrying"""
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status in RETRY_STATUSES
+    return isinstance(exc, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+def _retry_wait(retry_state) -> float:
+    """Exponential backoff, stretched to honour a Retry-After header"""
+    wait = _backoff(retry_state)
+    headers = getattr(retry_state.outcome.exception(), "headers", None)
+    try:
+        retry_after = float(headers.get("Retry-After")) if headers else 0
+    except (TypeError, ValueError):
+        retry_after = 0
+    return min(max(wait, retry_after), MAX_RETRY_WAIT)
+
+async def _post_json(session, body: bytes, headers) -> dict:
+    """
+    POST a pre-encoded JSON body to the Perplexity API, retrying transient failures
+    A response body that is not valid JSON raises aiohttp.ContentTypeError
+    """
+    async for attempt in AsyncRetrying(
+        stop=stop_after_attempt(MAX_ATTEMPTS),
+        wait=_retry_wait,
+        retry=retry_if_exception(_is_transient),
+        reraise=True
+    ):
+        with attempt:
+            if attempt.retry_state.attempt_number > 1:
+                print(f"🔄 Retrying Perplexity request (attempt {attempt.retry_state.attempt_number}/{MAX_ATTEMPTS})...")
+            async with session.post(API_URL, data=body, headers=headers) as response:
+                response.raise_for_status()
+                raw = await response.read()
+                try:
+                    return _loads(raw)
+                except ValueError as e:
+                    raise aiohttp.ContentTypeError(
+                        response.request_info,
+                        response.history,
+                        status=response.status,
+                        message=f"Invalid JSON in response body: {e}",
+                        headers=response.headers
+                    ) from e
+
+def _trends_cache_path(count) -> str:
+    """Cache file for this count in the current hour bucket"""
+    bucket = datetime.now().strftime("%Y-%m-%d-%H")
+    digest = hashlib.sha1(f"{count}:{bucket}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(TRENDS_CACHE_DIR, f"trends_{digest}.json")
+
+def load_cached_trends(count):
+    """
+    Return a cached fetch result for count if one is younger than the TTL
+    Returns: Result dict or None
+    """
+    if TRENDS_CACHE_TTL <= 0:
+        return None
+    path = _trends_cache_path(count)
+    try:
+        if time.time() - os.path.getmtime(path) > TRENDS_CACHE_TTL:
+            return None
+        with open(path, "rb") as f:
+            return _loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+def save_cached_trends(count, result):
+    """Write a fetch result to the cache (temp file + atomic rename)"""
+    if TRENDS_CACHE_TTL <= 0:
+        return
+    path = _trends_cache_path(count)
+    try:
+        os.makedirs(TRENDS_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=TRENDS_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(_dumps_pretty(result))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️  Could not cache trends: {e}")
+
 def get_date_context() -> dict:
     """Generate date context for the prompt"""
     today = datetime.now()
@@ -28,19 +172,11 @@ def get_previously_analyzed_trends() -> list:
     Returns: List of trend names to exclude
     """
     try:
-        client = MongoClient(MONGODB_CONNECTION_STRING)
-        db = client['thewinningteam']
-        collection = db['trends']
+        collection = get_trends_collection()
 
-        # Get all trend names from the last 30 days
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        previous_trends = collection.find(
-            {"created_at": {"$gte": thirty_days_ago}},
-            {"name": 1, "_id": 0}
-        )
-
-        trend_names = [trend["name"] for trend in previous_trends]
-        client.close()
+        # Get all distinct trend names from the last 30 days
+        thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
+        trend_names = collection.distinct("name", {"created_at": {"$gte": thirty_days_ago}})
 
         print(f"📋 Found {len(trend_names)} previously analyzed trends to exclude")
         return trend_names
@@ -51,15 +187,34 @@ def get_previously_analyzed_trends() -> list:
         return []
 
 def fetch_genz_trends(count=20):
+    """
+    Fetch Gen Z trends using Perplexity API (blocking wrapper)
+    Returns: JSON object with marketable trends
+    """
+    async def run():
+        async with _new_session() as session:
+            return await fetch_genz_trends_async(count, session=session)
+
+    return asyncio.run(run())
+
+async def fetch_genz_trends_async(count=20, session=None):
     """
     Fetch Gen Z trends using Perplexity API
     Automatically excludes previously analyzed trends from MongoDB
+    Args:
+        count: Number of trends to request
+        session: aiohttp session to use (defaults to the shared session)
     Returns: JSON object with marketable trends
     """
+    cached = load_cached_trends(count)
+    if cached is not None:
+        print(f"📦 Using cached trends (younger than {TRENDS_CACHE_TTL}s)")
+        return cached
+
     dates = get_date_context()
 
-    # Get previously analyzed trends from MongoDB
-    excluded_trends = get_previously_analyzed_trends()
+    # Get previously analyzed trends from MongoDB (blocking driver, so off the loop)
+    excluded_trends = await asyncio.to_thread(get_previously_analyzed_trends)
 
     # Add static exclusion list (fallback)
     static_exclusions = [
@@ -142,13 +297,14 @@ Focus on trends from the last 2 weeks only. Include viral TikTok trends, fashion
         "max_tokens": 4000
     }
 
-    try:
-        # Make API request
-        response = requests.post(API_URL, json=payload, headers=headers, timeout=60)
-        response.raise_for_status()
+    if session is None:
+        session = await get_session()
 
-        # Parse response
-        data = response.json()
+    content = None
+    try:
+        # Make API request and parse response (body encoded once, reused by retries)
+        body = orjson.dumps(payload) if ORJSON_AVAILABLE else json.dumps(payload).encode("utf-8")
+        data = await _post_json(session, body, headers)
 
         # Extract content from response
         if "choices" in data and len(data["choices"]) > 0:
@@ -157,33 +313,27 @@ Focus on trends from the last 2 weeks only. Include viral TikTok trends, fashion
 
             # Try to parse JSON from content
             # Handle cases where the model might add markdown formatting
-            content_clean = content.strip()
-            if content_clean.startswith("```json"):
-                content_clean = content_clean[7:]
-            if content_clean.startswith("```"):
-                content_clean = content_clean[3:]
-            if content_clean.endswith("```"):
-                content_clean = content_clean[:-3]
-
-            trends_data = json.loads(content_clean.strip())
-
-            # Add metadata
-            result = {
-                "metadata": {
-                    "query_date": dates["today"],
-                    "date_range": f"{dates['two_weeks_ago']} to {dates['today']}",
-                    "source": "Perplexity Sonar API",
-                    "excluded_count": len(all_exclusions),
-                    "citations": citations[:10] if citations else []  # Top 10 citations
-                },
-                "trends": trends_data.get("trends", [])
+            match = _FENCE_RE.match(content)
+            content_clean = match.group(1) if match else content.strip()
+
+            trends_data = _loads(content_clean)
+
+            # Add metadata to the parsed reply in place
+            trends_data.setdefault("trends", [])
+            trends_data["metadata"] = {
+                "query_date": dates["today"],
+                "date_range": f"{dates['two_weeks_ago']} to {dates['today']}",
+                "source": "Perplexity Sonar API",
+                "excluded_count": len(all_exclusions),
+                "citations": citations[:10] if citations else []  # Top 10 citations
             }
 
-            return result
+            save_cached_trends(count, trends_data)
+            return trends_data
         else:
             raise ValueError("No content in API response")
 
-    except requests.exceptions.RequestException as e:
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         print(f"API Request Error: {e}")
         return {"error": f"API request failed: {str(e)}"}
     except json.JSONDecodeError as e:
@@ -197,7 +347,7 @@ Focus on trends from the last 2 weeks only. Include viral TikTok trends, fashion
 def save_to_file(data, filename="genz_trends.json"):
     """Save trends data to JSON file"""
     with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write(_dumps_pretty(data))
     print(f"✓ Trends saved to {filename}")
 
 def main():
@@ -235,7 +385,7 @@ def main():
     print("\n" + "=" * 60)
     print("📄 Full JSON Output:")
     print("=" * 60)
-    print(json.dumps(trends_data, indent=2, ensure_ascii=False))
+    print(_dumps_pretty(trends_data))
 
 if __name__ == "__main__":
     main()
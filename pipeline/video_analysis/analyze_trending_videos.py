@@ -1,12 +1,23 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import os
 import json
 import random
 import re
-from pytubefix import YouTube
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from random import choice
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 # ==========================================
 # CONFIGURATION
@@ -19,21 +30,51 @@ except ImportError:
     TWELVE_LABS_BASE_URL = "https://api.twelvelabs.io/v1.2" 
     exit(1)
 
+# Max Twelve Labs requests in flight across all trends/videos (rate limit guard)
+TWELVE_LABS_CONCURRENCY = int(os.getenv("TWELVE_LABS_CONCURRENCY", "4"))
+TWELVE_LABS_SEM = threading.BoundedSemaphore(TWELVE_LABS_CONCURRENCY)
+
+# Shared keep-alive session for YouTube and Twelve Labs calls. Transient
+# errors are retried for idempotent methods only, so uploads and index
+# creation are never sent twice.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+))
+
+def twelve_labs_request(method, url, **kwargs):
+    """Send a Twelve Labs API request, holding a concurrency slot only while it runs."""
+    with TWELVE_LABS_SEM:
+        return _SESSION.request(method, url, **kwargs)
+
 # ==========================================
 # HELPER FUNCTIONS
 # ==========================================
 
+def _loads(data):
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+def _json(res):
+    """Decode a response body (orjson when installed; errors subclass json.JSONDecodeError)"""
+    return orjson.loads(res.content) if ORJSON_AVAILABLE else res.json()
+
+_DURATION_RE = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
+
 def parse_duration(duration_str):
     """Parse ISO 8601 duration format (PT#M#S) to seconds"""
-    pattern = r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?'
-    match = re.match(pattern, duration_str)
+    match = _DURATION_RE.match(duration_str)
     if not match:
         return 0
 
-    # Safely convert matched groups (they may be None)
-    hours = int(match.group(1)) if match.group(1) is not None else 0
-    minutes = int(match.group(2)) if match.group(2) is not None else 0
-    seconds = int(match.group(3)) if match.group(3) is not None else 0
+    # Unmatched groups are None
+    hours, minutes, seconds = (int(g or 0) for g in match.groups())
     return hours * 3600 + minutes * 60 + seconds
 
 def clean_text(text):
@@ -61,9 +102,9 @@ def get_trending_videos(max_results=2, trend_filter=None):
     }
     
     try:
-        res = requests.get(search_url, params=params)
+        res = _SESSION.get(search_url, params=params)
         res.raise_for_status()
-        search_items = res.json().get('items', [])
+        search_items = _json(res).get('items', [])
     except Exception as e:
         print(f"  ❌ YouTube API Error: {e}")
         return []
@@ -81,8 +122,8 @@ def get_trending_videos(max_results=2, trend_filter=None):
         'key': YOUTUBE_API_KEY
     }
     
-    details_res = requests.get(details_url, params=details_params)
-    details_data = details_res.json().get('items', [])
+    details_res = _SESSION.get(details_url, params=details_params)
+    details_data = _json(details_res).get('items', [])
 
     valid_videos = []
     for item in details_data:
@@ -105,6 +146,8 @@ def get_trending_videos(max_results=2, trend_filter=None):
 
 def download_video(url, filename):
     try:
+        # Imported on first download to keep module import (and CLI start) cheap
+        from pytubefix import YouTube
         yt = YouTube(url)
         # Try getting highest resolution mp4, fallback to first
         stream = yt.streams.filter(file_extension='mp4').get_highest_resolution()
@@ -127,7 +170,8 @@ def create_smart_index():
     url = f"{TWELVE_LABS_BASE_URL}/indexes"
     headers = {"x-api-key": TWELVE_LABS_API_KEY, "Content-Type": "application/json"}
     
-    index_name = f"trend_analysis_{int(time.time())}"
+    # Suffix keeps names unique when several trends are analyzed concurrently
+    index_name = f"trend_analysis_{int(time.time())}_{uuid.uuid4().hex[:8]}"
     
     # 1. Try PEGASUS (Generative)
     try:
@@ -136,10 +180,10 @@ def create_smart_index():
             "index_name": index_name + "_pegasus",
             "models": [{"model_name": "pegasus1.2", "model_options": ["visual", "audio"]}]
         }
-        res = requests.post(url, headers=headers, json=data)
+        res = twelve_labs_request("POST", url, headers=headers, json=data)
         if res.status_code == 201:
             print("  ✅ Pegasus Index Created!")
-            return res.json()['_id']
+            return _json(res)['_id']
         else:
             print(f"  ⚠️ Pegasus creation failed ({res.status_code}): {res.text}")
     except Exception as e:
@@ -152,10 +196,10 @@ def create_smart_index():
         "models": [{"model_name": "marengo2.6", "model_options": ["visual", "audio"]}]
     }
     try:
-        res = requests.post(url, headers=headers, json=data)
+        res = twelve_labs_request("POST", url, headers=headers, json=data)
         res.raise_for_status()
         print("  ✅ Marengo Index Created!")
-        return res.json()['_id']
+        return _json(res)['_id']
     except Exception as e:
         print(f"  ❌ CRITICAL: Could not create any index. {e}")
         if 'res' in locals(): print(f"  API Response: {res.text}")
@@ -169,33 +213,57 @@ def index_video(index_id, video_path):
         files = {'video_file': (os.path.basename(video_path), f, 'video/mp4')}
         data = {'index_id': index_id, 'language': 'en'}
         try:
-            res = requests.post(url, headers=headers, files=files, data=data)
+            res = twelve_labs_request("POST", url, headers=headers, files=files, data=data)
             res.raise_for_status()
-            return res.json().get('_id')
+            return _json(res).get('_id')
         except Exception as e:
             print(f"  ❌ Upload failed: {e}")
             print(f"  Response: {res.text}")
             return None
 
-def wait_for_task(task_id):
+def wait_for_task(task_id, initial_delay=1.0, max_delay=15.0):
     url = f"{TWELVE_LABS_BASE_URL}/tasks/{task_id}"
     headers = {"x-api-key": TWELVE_LABS_API_KEY}
     
     print("  ⏳ Processing...", end="", flush=True)
+    # Short tasks are picked up quickly, long ones are polled less often
+    delay = initial_delay
+    task = {}
     while True:
-        res = requests.get(url, headers=headers)
-        status = res.json().get('status')
+        res = twelve_labs_request("GET", url, headers=headers)
+        # 304 means the status has not changed since the last poll
+        if res.status_code != 304:
+            task = _json(res)
+            etag = res.headers.get('ETag')
+            if etag:
+                headers['If-None-Match'] = etag
+        status = task.get('status')
         if status == 'ready':
             print(" Done!")
             # WARM UP: Give the index a moment to propagate
             time.sleep(2)
-            return res.json().get('video_id')
+            return task.get('video_id')
         if status == 'failed':
-            print(f" Failed! Reason: {res.json().get('process_result')}")
+            print(f" Failed! Reason: {task.get('process_result')}")
             return None
-        time.sleep(2)
+        time.sleep(delay)
+        delay = min(delay * 1.5, max_delay)
         print(".", end="", flush=True)
 
+def _join_stream_data(lines):
+    """Concatenate the 'data' fields of NDJSON lines (raw bytes), skipping bad lines."""
+    full_text = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            obj = _loads(line)
+        except ValueError:
+            continue
+        if isinstance(obj, dict) and 'data' in obj:
+            full_text.append(obj['data'])
+    return "".join(full_text)
+
 def generate_text_robust(video_id, prompt):
     """
     Tries Generate endpoint with stream=False to avoid JSON errors.
@@ -214,28 +282,27 @@ def generate_text_robust(video_id, prompt):
     }
     
     try:
-        res = requests.post(url_gen, headers=headers, json=payload_gen)
-        
-        if res.status_code == 200:
-            try:
-                # Try standard parsing
-                return res.json().get('data', '')
-            except json.JSONDecodeError:
-                # ROBUSTNESS: If API returns stream despite stream=False, parse line-by-line
-                # The error "Extra data" means multiple JSON objects are present
-                print("  ⚠️ Streaming response detected, assembling manually...")
-                full_text = []
-                for line in res.text.strip().split('\n'):
-                    try:
-                        if line.strip():
-                            obj = json.loads(line)
-                            if 'data' in obj:
-                                full_text.append(obj['data'])
-                    except:
-                        continue
-                return "".join(full_text)
-        else:
-            print(f"\n  ⚠️ Generate API Error ({res.status_code}): {res.text}")
+        res = twelve_labs_request("POST", url_gen, headers=headers, json=payload_gen, stream=True)
+        try:
+            if res.status_code == 200:
+                # A declared NDJSON/event stream is consumed line by line as it arrives
+                content_type = res.headers.get('Content-Type', '')
+                if 'ndjson' in content_type or 'stream' in content_type:
+                    print("  ⚠️ Streaming response detected, assembling incrementally...")
+                    return _join_stream_data(res.iter_lines())
+                try:
+                    # Try standard parsing
+                    return _json(res).get('data', '')
+                except json.JSONDecodeError:
+                    # ROBUSTNESS: If API returns stream despite stream=False, parse line-by-line
+                    # The error "Extra data" means multiple JSON objects are present.
+                    # iter_lines() walks the already-buffered bytes without decoding the body.
+                    print("  ⚠️ Streaming response detected, assembling manually...")
+                    return _join_stream_data(res.iter_lines())
+            else:
+                print(f"\n  ⚠️ Generate API Error ({res.status_code}): {res.text}")
+        finally:
+            res.close()
     except Exception as e:
         print(f"\n  ⚠️ Request Error: {e}")
 
@@ -248,9 +315,9 @@ def generate_text_robust(video_id, prompt):
     }
     
     try:
-        res = requests.post(url_sum, headers=headers, json=payload_sum)
+        res = twelve_labs_request("POST", url_sum, headers=headers, json=payload_sum)
         if res.status_code == 200:
-            return res.json().get('summary', '')
+            return _json(res).get('summary', '')
         else:
             print(f"  ❌ Summarize API Error ({res.status_code}): {res.text}")
             return f"Error analyzing video: API returned {res.status_code}"
@@ -267,13 +334,18 @@ def analyze_video_content(video_id, video_metadata):
         "Describe specific actions, especially objects, and the setting chronologically. "
         "Do not be generic."
     )
-    what_happened = generate_text_robust(video_id, narrative_prompt)
     
     # 2. Trending Analysis
     trend_prompt = (
         "List 3 reasons why this video is engaging based on its visual style and content via a physical, marketable insigths. Identify material descriptions/insights about the trend."
     )
-    trend_raw = generate_text_robust(video_id, trend_prompt)
+    
+    # The two prompts are independent, so run them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        narrative_future = executor.submit(generate_text_robust, video_id, narrative_prompt)
+        trend_future = executor.submit(generate_text_robust, video_id, trend_prompt)
+        what_happened = narrative_future.result()
+        trend_raw = trend_future.result()
     
     # Parse trend reasons
     reasons = []
@@ -290,6 +362,39 @@ def analyze_video_content(video_id, video_metadata):
     return what_happened, reasons[:3]
 
 
+def process_video(index_id, vid):
+    """
+    Download, index and analyze one video.
+    Returns (downloaded, entry) where entry is None if any later step failed.
+    """
+    print(f"\n🎥 Processing: {vid['title'][:50]}...")
+    filename = f"temp_{vid['video_id']}_{uuid.uuid4().hex[:8]}.mp4"
+    
+    if not download_video(vid['url'], filename):
+        return False, None
+    
+    entry = None
+    try:
+        task_id = index_video(index_id, filename)
+        if task_id:
+            video_id = wait_for_task(task_id)
+            if video_id:
+                print("  🧠 Analyzing content...")
+                what, why = analyze_video_content(video_id, vid)
+                
+                entry = {
+                    "title": vid['title'],
+                    "url": vid['url'],
+                    "what_is_happening": what,
+                    "why_its_trending": why
+                }
+                print("  ✓ Done")
+    finally:
+        if os.path.exists(filename): os.remove(filename)
+    
+    return True, entry
+
+
 def analyze_trend(trend, count=3):
 
     # 1. Get Videos
@@ -302,33 +407,18 @@ def analyze_trend(trend, count=3):
 
     analyzed_data = []
     
-    # 3. Process
-    counter = 0
-    for vid in videos:
-        if counter == count:break
-        
-        #could implement a buffer trend video logic to fix some of the videos failing issue (having 5 videos to process and processing until 2 of them are ok)
-        print(f"\n🎥 Processing: {vid['title'][:50]}...")
-        filename = f"temp_{vid['video_id']}.mp4"
-        
-        if download_video(vid['url'], filename):
-            counter +=1
-            task_id = index_video(index_id, filename)
-            if task_id:
-                video_id = wait_for_task(task_id)
-                if video_id:
-                    print("  🧠 Analyzing content...")
-                    what, why = analyze_video_content(video_id, vid)
-                    
-                    analyzed_data.append({
-                        "title": vid['title'],
-                        "url": vid['url'],
-                        "what_is_happening": what,
-                        "why_its_trending": why
-                    })
-                    print("  ✓ Done")
-            
-            if os.path.exists(filename): os.remove(filename)
+    # 3. Process: videos are independent, so handle them concurrently. As
+    # before, stop once `count` videos have downloaded; each wave only starts
+    # as many spare candidates as are still needed.
+    downloaded = 0
+    remaining = iter(videos)
+    with ThreadPoolExecutor(max_workers=max(1, count)) as executor:
+        while downloaded < count:
+            wave = list(islice(remaining, count - downloaded))
+            if not wave: break
+            for ok, entry in executor.map(lambda vid: process_video(index_id, vid), wave):
+                if ok: downloaded += 1
+                if entry: analyzed_data.append(entry)
 
     # 4. Save
     output = {